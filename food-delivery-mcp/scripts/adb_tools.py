@@ -12,7 +12,9 @@
 import asyncio
 import json
 import os
+import subprocess
 import sys
+import time
 from pathlib import Path
 
 # 禁用代理（避免 SOCKS 代理问题）
@@ -21,6 +23,166 @@ for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy
 
 from droidrun.tools import AdbTools
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json_file(obj, path):
+    """保存 JSON 文件（优先 orjson，C 实现比标准库快 3-10 倍）"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+# 模块级单例：复用已连接的 AdbTools，避免每个命令都重新 connect（TCP+认证 ~1-3s）
+_tools: AdbTools | None = None
+
+
+async def get_tools() -> AdbTools:
+    """获取已连接的 AdbTools 单例（懒初始化）"""
+    global _tools
+    if _tools is None:
+        tools = AdbTools()
+        await tools.connect()
+        _tools = tools
+    return _tools
+
+
+class PersistentShell:
+    """长驻 adb shell 会话
+
+    保持一个 `adb shell` 子进程，通过 stdin 发送换行分隔的命令，
+    用 sentinel 标记命令结束，避免每条命令重新建立 shell。
+    """
+
+    _SENTINEL = "__DONE__"
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+
+    def _ensure_proc(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["adb", "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        return self._proc
+
+    def run(self, command: str) -> str:
+        """执行一条 shell 命令，返回 sentinel 之前的输出"""
+        proc = self._ensure_proc()
+        proc.stdin.write(f"{command}\necho {self._SENTINEL}\n")
+        proc.stdin.flush()
+
+        lines = []
+        for line in proc.stdout:
+            if line.strip() == self._SENTINEL:
+                break
+            lines.append(line)
+        return ''.join(lines)
+
+    def close(self):
+        """关闭 shell 会话"""
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                self._proc.stdin.write("exit\n")
+                self._proc.stdin.flush()
+            except OSError:
+                pass
+            self._proc.terminate()
+        self._proc = None
+
+
+# 纯 shell 操作（back/home/swipe 等）共用的长驻会话
+_shell: PersistentShell | None = None
+
+
+def get_shell() -> PersistentShell:
+    """获取长驻 adb shell 会话单例"""
+    global _shell
+    if _shell is None:
+        _shell = PersistentShell()
+    return _shell
+
+
+async def exec_adb_script(commands: list[str], validate_after: bool = False):
+    """把多条 shell 命令合并为一次 adb shell 调用
+
+    对确定性的操作序列（点击→清空→输入等），逐条 await 每次都要付一轮
+    ADB 往返；合并成 `;` 分隔的脚本后只需一次往返，也不会在中间步骤
+    触发截图。
+
+    Args:
+        commands: shell 命令列表，如 ["input tap 500 800", "input keyevent 67"]
+        validate_after: 是否在执行后刷新一次页面状态（默认 False，跳过截图）
+
+    Returns:
+        (output, elements): shell 输出；validate_after 为 True 时附带刷新后的元素列表
+    """
+    _invalidate_state_cache()
+    script = "; ".join(commands)
+    proc = await asyncio.create_subprocess_exec(
+        "adb", "shell", script,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    stdout, _ = await proc.communicate()
+    output = stdout.decode(errors='replace')
+
+    elements = None
+    if validate_after:
+        tools = await get_tools()
+        _, _, elements, _ = await tools.get_state()
+    return output, elements
+
+
+# 最近一次页面状态的短 TTL 缓存：同一会话里相邻操作（如找 EditText 后输入）
+# 不必重复付截图+层级抓取的开销
+_STATE_TTL = 1.5
+_state_cache: tuple[float, tuple] | None = None
+
+
+async def cached_get_state(tools: AdbTools, max_age: float = _STATE_TTL):
+    """获取页面状态，在 max_age 秒内复用上一次结果"""
+    global _state_cache
+    if _state_cache is not None and time.monotonic() - _state_cache[0] < max_age:
+        return _state_cache[1]
+    state = await tools.get_state()
+    _state_cache = (time.monotonic(), state)
+    return state
+
+
+def _invalidate_state_cache():
+    """页面被操作改变后调用，丢弃缓存的状态"""
+    global _state_cache
+    _state_cache = None
+
+
+async def _tap_coordinates(x: int, y: int):
+    """直接按坐标点击（一条 input tap，不经过 shell 字符串解析）"""
+    proc = await asyncio.create_subprocess_exec(
+        "adb", "shell", "input", "tap", str(x), str(y),
+    )
+    await proc.wait()
+
+
+def _bounds_center(bounds: str) -> tuple[int, int] | None:
+    """从 "x1,y1,x2,y2" 格式的 bounds 计算中心点坐标"""
+    try:
+        coords = [int(x) for x in bounds.split(',')]
+    except ValueError:
+        return None
+    if len(coords) != 4:
+        return None
+    return (coords[0] + coords[2]) // 2, (coords[1] + coords[3]) // 2
+
 
 async def get_state(output_file: str = None):
     """获取当前页面状态
@@ -28,10 +190,9 @@ async def get_state(output_file: str = None):
     Args:
         output_file: 可选，保存元素列表到 JSON 文件
     """
-    tools = AdbTools()
-    await tools.connect()
+    tools = await get_tools()
     
-    desc, screenshot_b64, elements, phone_state = await tools.get_state()
+    desc, screenshot_b64, elements, phone_state = await cached_get_state(tools, max_age=0)
     
     print("=" * 60)
     print("页面描述 (desc):")
@@ -42,18 +203,17 @@ async def get_state(output_file: str = None):
     print(f"元素列表 (共 {len(elements)} 个):")
     print("=" * 60)
     
-    # 打印所有有文本的元素
-    elements_with_text = []
-    for el in elements:
-        text = el.get('text', '')
-        idx = el.get('index')
-        classname = el.get('className', '')
-        bounds = el.get('bounds', '')
-        
-        if text and len(text.strip()) > 0:
-            info = f"[{idx:3d}] text='{text}' | class={classname} | bounds={bounds}"
-            print(info)
-            elements_with_text.append(el)
+    # 一次遍历抽出各字段（SoA 行），过滤后拼成一个缓冲区整体输出，
+    # 避免每个元素多次 dict 查找和逐行 print 刷新
+    rows = [
+        (el.get('text', ''), el.get('index'), el.get('className', ''), el.get('bounds', ''))
+        for el in elements
+    ]
+    elements_with_text = [r for r in rows if r[0] and r[0].strip()]
+    print("\n".join(
+        f"[{i:3d}] text='{t}' | class={c} | bounds={b}"
+        for t, i, c, b in elements_with_text
+    ))
     
     print("\n" + "=" * 60)
     print("手机状态 (phone_state):")
@@ -62,13 +222,11 @@ async def get_state(output_file: str = None):
     
     # 保存到文件
     if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(elements, f, ensure_ascii=False, indent=2)
+        _dump_json_file(elements, output_file)
         print(f"\n完整元素列表已保存到: {output_file}")
     elif output_file is None:  # 默认保存
         default_file = "page_elements.json"
-        with open(default_file, 'w', encoding='utf-8') as f:
-            json.dump(elements, f, ensure_ascii=False, indent=2)
+        _dump_json_file(elements, default_file)
         print(f"\n完整元素列表已保存到: {default_file}")
     
     return desc, elements, phone_state
@@ -80,11 +238,11 @@ async def tap(index: int):
     Args:
         index: 元素的 index
     """
-    tools = AdbTools()
-    await tools.connect()
+    tools = await get_tools()
     
     print(f"点击元素 index={index}")
     await tools.tap(index)
+    _invalidate_state_cache()
     print("点击完成")
     
     # 等待一下让页面响应
@@ -98,10 +256,9 @@ async def tap_by_text(text: str, exact: bool = False):
         text: 要查找的文本
         exact: 是否精确匹配（默认 False，部分匹配）
     """
-    tools = AdbTools()
-    await tools.connect()
+    tools = await get_tools()
     
-    desc, _, elements, _ = await tools.get_state()
+    desc, _, elements, _ = await cached_get_state(tools)
     
     matched_elements = []
     for el in elements:
@@ -125,9 +282,17 @@ async def tap_by_text(text: str, exact: bool = False):
         print(f"  [{idx}] {el_text} | bounds={bounds}")
     
     if len(matched_elements) == 1:
-        idx = matched_elements[0].get('index')
+        el = matched_elements[0]
+        idx = el.get('index')
+        # 坐标优先：bounds 已知时直接 input tap，跳过 tap(index) 的二次层级解析；
+        # bounds 解析失败才退回 tools.tap
+        center = _bounds_center(el.get('bounds', ''))
         print(f"\n点击元素 [{idx}]")
-        await tools.tap(idx)
+        if center:
+            await _tap_coordinates(*center)
+        else:
+            await tools.tap(idx)
+        _invalidate_state_cache()
         print("点击完成")
         await asyncio.sleep(1)
     else:
@@ -142,25 +307,47 @@ async def input_text(text: str, index: int = None, clear: bool = True):
         index: 元素的 index，如果不提供则查找第一个 EditText
         clear: 是否先清空输入框（默认 True）
     """
-    tools = AdbTools()
-    await tools.connect()
-    
+    tools = await get_tools()
+
+    desc, _, elements, _ = await cached_get_state(tools)
+    target = None
     if index is None:
         # 查找第一个 EditText
-        desc, _, elements, _ = await tools.get_state()
         for el in elements:
             classname = el.get('className', '')
             if 'EditText' in classname:
                 index = el.get('index')
+                target = el
                 print(f"找到 EditText 元素 index={index}")
                 break
-        
+
         if index is None:
             print("未找到 EditText 元素，请手动指定 index")
             return
-    
+    else:
+        for el in elements:
+            if el.get('index') == index:
+                target = el
+                break
+
     print(f"输入文本到元素 index={index}: '{text}'")
-    await tools.input_text(text, index, clear=clear)
+
+    # 快速路径：ASCII 文本可以合并为一条 shell 脚本（点击→清空→输入）一次往返完成；
+    # 中文等非 ASCII 文本 input text 不支持，仍走 tools.input_text（IME 方式）。
+    # 含单引号的文本会破坏设备端 shell 的 '...' 包裹，也走慢路径
+    center = _bounds_center(target.get('bounds', '')) if target else None
+    if center and text.isascii() and "'" not in text:
+        commands = [f"input tap {center[0]} {center[1]}"]
+        if clear:
+            # 注意：退格清空最多删 30 个字符，更长的旧内容会留下残值
+            commands.append("input keyevent KEYCODE_MOVE_END")
+            commands.extend(["input keyevent KEYCODE_DEL"] * 30)
+        escaped = text.replace(' ', '%s')
+        commands.append(f"input text '{escaped}'")
+        await exec_adb_script(commands)
+    else:
+        await tools.input_text(text, index, clear=clear)
+        _invalidate_state_cache()
     print("输入完成")
     await asyncio.sleep(0.5)
 
@@ -171,11 +358,11 @@ async def start_app(package_name: str):
     Args:
         package_name: 应用包名，如 "com.sankuai.meituan.takeoutnew"
     """
-    tools = AdbTools()
-    await tools.connect()
+    tools = await get_tools()
     
     print(f"启动应用: {package_name}")
     await tools.start_app(package_name)
+    _invalidate_state_cache()
     print("应用启动完成")
     await asyncio.sleep(2)
 
@@ -190,33 +377,27 @@ async def swipe(start_x: int, start_y: int, end_x: int, end_y: int, duration: in
         end_y: 结束 y 坐标
         duration: 滑动时长（毫秒，默认 500）
     """
-    tools = AdbTools()
-    await tools.connect()
-    
     print(f"滑动: ({start_x}, {start_y}) -> ({end_x}, {end_y}), 时长={duration}ms")
-    await tools.swipe(start_x, start_y, end_x, end_y, duration)
+    get_shell().run(f"input swipe {start_x} {start_y} {end_x} {end_y} {duration}")
+    _invalidate_state_cache()
     print("滑动完成")
     await asyncio.sleep(1)
 
 
 async def press_back():
     """按下返回键"""
-    tools = AdbTools()
-    await tools.connect()
-    
     print("按下返回键")
-    await tools.press_back()
+    get_shell().run("input keyevent 4")
+    _invalidate_state_cache()
     print("完成")
     await asyncio.sleep(0.5)
 
 
 async def press_home():
     """按下 Home 键"""
-    tools = AdbTools()
-    await tools.connect()
-    
     print("按下 Home 键")
-    await tools.press_home()
+    get_shell().run("input keyevent 3")
+    _invalidate_state_cache()
     print("完成")
     await asyncio.sleep(0.5)
 
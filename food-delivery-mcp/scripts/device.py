@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""设备连接管理（uiautomator2 版）
+
+test_search_flow.py 等脚本共用的设备封装：负责连接、压低 UIA2 等待
+超时和基础信息查询。
+"""
+
+import time
+
+import uiautomator2 as u2
+
+# device.info 结果的缓存时长（秒）：info 是一次到设备端 agent 的 RPC，
+# 连接检查等幂等调用没必要每次都打一轮
+_INFO_TTL = 2.0
+
+
+class DeviceManager:
+    """uiautomator2 设备管理器，按需连接并复用同一个 device 对象"""
+
+    def __init__(self, serial: str | None = None):
+        self.serial = serial
+        self._device = None
+        self._info_cache = None
+        self._info_ts = 0.0
+        # 屏幕宽高在同一台设备上不会变，连接时取一次后不再走 RPC
+        self._display_w = None
+        self._display_h = None
+
+    def connect(self):
+        """连接设备（幂等，重复调用返回同一对象）
+
+        连接后立刻压低 UIA2 的空闲/选择器等待：默认 10s 的
+        waitForIdleTimeout 会让每次元素查询在美团这种常驻动画的
+        页面上干等"空闲"，把它们压到 ~100ms 后查询一命中就返回。
+        """
+        if self._device is None:
+            self._device = u2.connect(self.serial) if self.serial else u2.connect()
+            self._device.jsonrpc.setConfigurator({
+                "waitForIdleTimeout": 100,
+                "waitForSelectorTimeout": 100,
+                "actionAcknowledgmentTimeout": 100,
+                "keyInjectionDelay": 0,
+            })
+            self._info_cache = None
+            info = self._device.info
+            self._display_w = info.get('displayWidth', 1080)
+            self._display_h = info.get('displayHeight', 1920)
+            self._info_cache = info
+            self._info_ts = time.monotonic()
+        return self._device
+
+    @property
+    def device(self):
+        """当前设备对象（未连接时自动连接）"""
+        return self.connect()
+
+    def _get_info(self, max_age: float = _INFO_TTL):
+        """带 TTL 缓存的 device.info，出错时清缓存并透传异常"""
+        now = time.monotonic()
+        if self._info_cache is not None and now - self._info_ts < max_age:
+            return self._info_cache
+        try:
+            self._info_cache = self.device.info
+        except Exception:
+            self._info_cache = None
+            raise
+        self._info_ts = time.monotonic()
+        return self._info_cache
+
+    def is_connected(self) -> bool:
+        """设备是否可用（缓存有效期内直接视为已连接）"""
+        try:
+            return bool(self._get_info())
+        except Exception:
+            return False
+
+    def get_info(self):
+        """设备基础信息（分辨率、电量等）"""
+        return self._get_info()
+
+    def screen_size(self) -> tuple[int, int]:
+        """屏幕宽高 (width, height)，连接时缓存的常量，不发 RPC"""
+        if self._display_w is None:
+            self.connect()
+        return self._display_w, self._display_h
+
+
+if __name__ == "__main__":
+    mgr = DeviceManager()
+    d = mgr.connect()
+    print(f"已连接设备: {d.serial}")
+    print(f"屏幕尺寸: {mgr.screen_size()}")
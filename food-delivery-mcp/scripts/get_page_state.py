@@ -10,6 +10,22 @@ for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy
     os.environ.pop(key, None)
 
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json_file(obj, path):
+    """保存 JSON 文件（优先 orjson，C 实现比标准库快 3-10 倍）"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
 async def get_page_state():
     """获取当前页面状态"""
     from droidrun.tools import AdbTools
@@ -29,15 +45,15 @@ async def get_page_state():
     print(f"元素列表 (共 {len(elements)} 个):")
     print("=" * 60)
     
-    # 打印所有元素
-    for el in elements:
-        text = el.get('text', '')
-        idx = el.get('index')
-        classname = el.get('className', '')
-        bounds = el.get('bounds', '')
-        
-        if text:  # 只打印有文本的元素
-            print(f"[{idx:3d}] text='{text}' | class={classname} | bounds={bounds}")
+    # 一次遍历抽出各字段，过滤后整体输出（只打印有文本的元素）
+    rows = [
+        (el.get('text', ''), el.get('index'), el.get('className', ''), el.get('bounds', ''))
+        for el in elements
+    ]
+    print("\n".join(
+        f"[{i:3d}] text='{t}' | class={c} | bounds={b}"
+        for t, i, c, b in rows if t
+    ))
     
     print("\n" + "=" * 60)
     print("手机状态 (phone_state):")
@@ -46,8 +62,7 @@ async def get_page_state():
     
     # 保存完整元素列表到文件
     output_file = "page_elements.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(elements, f, ensure_ascii=False, indent=2)
+    _dump_json_file(elements, output_file)
     print(f"\n完整元素列表已保存到: {output_file}")
     
     return desc, elements
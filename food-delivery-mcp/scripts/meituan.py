@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""美团拼好饭自动化（uiautomator2 版）
+
+不走 DroidRun Agent 的固定流程实现：启动美团 → 关弹窗（结构扫描 +
+视觉模型兜底）→ 进拼好饭 → 搜索 → 解析套餐 → 下单 → 查订单状态。
+供 test_search_flow.py 之外需要完整流程的脚本复用。
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+# 禁用代理
+for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
+    os.environ.pop(key, None)
+
+import httpx
+import uiautomator2 as u2
+from PIL import Image
+from lxml import etree
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 美团外卖包名
+MEITUAN_PACKAGE = "com.sankuai.meituan.takeoutnew"
+
+# LLM 配置
+LLM_CONFIG = {
+    "api_key": "sk-8ca63b6b547c429ba348eeb131ae1bd0",
+    "base_url": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    "model": "qwen-plus",
+    "vl_model": "qwen-vl-plus",
+}
+
+# 弹窗关闭按钮的常见文本
+POPUP_TEXTS = ("我知道了", "关闭", "暂不", "取消")
+
+# 热路径正则统一在模块加载时编译（re 的内部缓存每次调用仍要哈希查找）
+_BOUNDS_RE = re.compile(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]')
+_TEXT_BOUNDS_RE = re.compile(r'text="([^"]+)"[^>]*bounds="\[(\d+),(\d+)\]')
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+_JSON_ARR_RE = re.compile(r'\[.*\]', re.DOTALL)
+_TIME_RE = re.compile(r'(\d{1,2}:\d{2})\s*送达')
+# 订单状态关键词，按流程先后排列：合并成一个交替式后整份 dump
+# 只扫一遍，命中的分组名直接就是状态值
+_STATUS_RE = re.compile(
+    r'(?P<pending_payment>待支付)|(?P<accepted>商家已接单)'
+    r'|(?P<picked_up>骑手已取餐)|(?P<delivering>配送中)'
+    r'|(?P<delivered>已送达)|(?P<cancelled>已取消)'
+)
+_PROGRESS_RE = re.compile(r'骑手.*?取餐|正在.*?配送|预计.*?送达')
+# 文本过滤用的噪声词和纯数字判定：放到模块级，
+# 热循环里不再每次调用重建集合、每条文本做两次 replace 拷贝
+_SKIP_WORDS = frozenset({'android.widget', 'android.view', 'mmp-', 'com.sankuai'})
+_NUMERIC_RE = re.compile(r'[\d.:]+')
+# dump 里这些属性下游从来不看（焦点类的还会随光标乱跳），
+# 解析/哈希前一次 re.sub 全部剥掉，XML 体积能缩小近半
+_ATTR_STRIP_RE = re.compile(
+    r' (?:resource-id|package|index|checkable|checked|focusable|focused'
+    r'|scrollable|long-clickable|password|selected|NAF)="[^"]*"'
+)
+
+
+def _clean_xml(xml: str) -> str:
+    """剥掉层级 XML 里无用的节点属性"""
+    return _ATTR_STRIP_RE.sub('', xml)
+
+
+def _parse_nodes(xml: str) -> list[tuple[str, str, int, str, bool]]:
+    """把层级 XML 一次性解析成 (text, desc, y, class, clickable) 列表
+
+    所有下游提取器（文本过滤、价格扫描）都在这个紧凑列表上做筛选，
+    同一份 XML 不再各跑一遍正则。
+    """
+    nodes = []
+    xml = _clean_xml(xml)
+    try:
+        context = etree.iterparse(
+            io.BytesIO(xml.encode('utf-8')), events=("end",), tag="node"
+        )
+        for _, elem in context:
+            text = elem.get("text") or ""
+            desc = elem.get("content-desc") or ""
+            if text or desc:
+                m = _BOUNDS_RE.match(elem.get("bounds", ""))
+                y = int(m.group(2)) if m else 0
+                nodes.append((
+                    text, desc, y,
+                    elem.get("class") or "",
+                    elem.get("clickable") == "true",
+                ))
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except Exception:
+        # dump 截断等解析失败时退回正则
+        for m in _TEXT_BOUNDS_RE.finditer(xml):
+            nodes.append((m.group(1), "", int(m.group(3)), "", False))
+    return nodes
+
+
+# 懒初始化的共享 HTTP 客户端：VL 和文本 LLM 调用复用同一条
+# keep-alive 连接（HTTP/2 多路复用），省掉每次调用的 TLS 握手
+_http_client: httpx.Client | None = None
+
+
+def _get_http_client() -> httpx.Client:
+    """获取模块级 httpx.Client 单例"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=4),
+            timeout=60,
+            trust_env=False,
+        )
+    return _http_client
+
+
+# 搜索结果解析的推测执行线程：LLM 请求在后台先飞，
+# 结构化解析命中就取消，不命中正好接上已在路上的响应
+_PARSE_POOL = ThreadPoolExecutor(max_workers=2)
+
+
+@dataclass
+class MealInfo:
+    """一个套餐的解析结果"""
+    name: str
+    price: str
+    delivery_time: str
+
+
+class MeituanAutomation:
+    """美团拼好饭固定流程自动化"""
+
+    def __init__(self, serial: str | None = None):
+        self.device = u2.connect(serial) if serial else u2.connect()
+        # 同一个动作里连续跑的扫描助手共享一帧层级，
+        # 避免每个助手各付一次几百毫秒的 dump 往返
+        self._xml_cache: tuple[float, str] | None = None
+
+    def _hierarchy(self, max_age: float = 0.3) -> str:
+        """带短 TTL 的 dump_hierarchy，点击/输入/等待后自动失效"""
+        now = time.monotonic()
+        if self._xml_cache is not None and now - self._xml_cache[0] < max_age:
+            return self._xml_cache[1]
+        xml = self.device.dump_hierarchy()
+        self._xml_cache = (time.monotonic(), xml)
+        return xml
+
+    def _invalidate_xml(self):
+        """丢弃缓存的层级帧（UI 可能已经变了）"""
+        self._xml_cache = None
+
+    def _wait_stable(self, timeout: float = 3.0, stable_for: float = 0.25):
+        """等待 UI 稳定：连续两帧层级哈希一致即返回
+
+        代替拍脑袋的固定 sleep——页面一稳定就继续，最多等 timeout。
+        """
+        deadline = time.monotonic() + timeout
+        last_digest = None
+        while time.monotonic() < deadline:
+            xml = self.device.dump_hierarchy()
+            # 哈希前剥掉易变属性：焦点跳动不会再被误判成"页面还在动"
+            digest = hashlib.blake2b(
+                _clean_xml(xml).encode('utf-8'), digest_size=8
+            ).digest()
+            if digest == last_digest:
+                self._xml_cache = (time.monotonic(), xml)
+                return
+            last_digest = digest
+            time.sleep(stable_for)
+        self._invalidate_xml()
+
+    # ------------------------------------------------------------
+    # 基础等待/点击
+    # ------------------------------------------------------------
+
+    def _wait(self, seconds: float):
+        """固定等待（等待期间 UI 多半会变，顺手失效层级缓存）"""
+        time.sleep(seconds)
+        self._invalidate_xml()
+
+    def _wait_for_element(self, timeout: float = 3.0, **kwargs):
+        """等待元素出现，返回元素或 None
+
+        u2 的 wait() 在设备端 agent 里等，单次 RPC 就搞定；
+        比主机侧 0.1s 粒度轮询 .exists（每次都是一趟 RPC）省得多。
+        """
+        elem = self.device(**kwargs)
+        return elem if elem.wait(timeout=timeout) else None
+
+    def _click_if_exists(self, timeout: float = 1.0, **kwargs) -> bool:
+        """元素存在就点击，返回是否点击"""
+        elem = self._wait_for_element(timeout=timeout, **kwargs)
+        if elem is not None:
+            elem.click()
+            self._invalidate_xml()
+            return True
+        return False
+
+    # ------------------------------------------------------------
+    # 弹窗处理
+    # ------------------------------------------------------------
+
+    def _try_dismiss_popup(self) -> bool:
+        """结构化方式关闭弹窗
+
+        一次 dump、一遍 iterparse 同时找两类目标：文本/描述命中候选
+        按钮的节点，和可点击且无文本的小 FrameLayout/ImageView（典型的
+        右上角关闭图标）。原来逐个文本各等 0.5s 要 4 次查询 + 1 次
+        dump，现在只剩这一次 dump。
+        """
+        xml = self._hierarchy()
+        text_hit = None   # (cx, cy, text)
+        icon_hit = None   # (cx, cy)
+        try:
+            context = etree.iterparse(
+                io.BytesIO(xml.encode('utf-8')), events=("end",), tag="node"
+            )
+            for _, elem in context:
+                text = elem.get("text") or ""
+                desc = elem.get("content-desc") or ""
+                m = _BOUNDS_RE.match(elem.get("bounds", ""))
+                if m:
+                    x1, y1, x2, y2 = map(int, m.groups())
+                    if text_hit is None and (text in POPUP_TEXTS or desc in POPUP_TEXTS):
+                        text_hit = ((x1 + x2) // 2, (y1 + y2) // 2, text or desc)
+                    elif (
+                        icon_hit is None
+                        and elem.get("clickable") == "true"
+                        and elem.get("class") in ("android.widget.FrameLayout",
+                                                  "android.widget.ImageView")
+                        and not text
+                        and not desc
+                        # 关闭图标通常很小且在上半屏
+                        and (x2 - x1) < 200 and (y2 - y1) < 200 and y1 < 1000
+                    ):
+                        icon_hit = ((x1 + x2) // 2, (y1 + y2) // 2)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        except Exception as e:
+            print(f"[DEBUG] 弹窗扫描失败: {e}")
+            return False
+
+        if text_hit is not None:
+            self.device.click(text_hit[0], text_hit[1])
+            self._invalidate_xml()
+            print(f"[DEBUG] 关闭弹窗: {text_hit[2]}")
+            return True
+        if icon_hit is not None:
+            self.device.click(*icon_hit)
+            self._invalidate_xml()
+            print("[DEBUG] 点击疑似关闭图标")
+            return True
+        return False
+
+    def _dismiss_with_vl(self) -> bool:
+        """视觉模型兜底：截图发给 VL 模型找关闭按钮坐标
+
+        弹窗基本都在屏幕中央：裁掉四周各 1/5，再把长边压到 1024、
+        存 JPEG q75，上传字节和视觉 token 都砍掉好几倍；返回坐标
+        按裁剪偏移和缩放比映射回设备像素。
+        """
+        # format='raw' 直接拿 screencap 的 PNG 字节，跳过 u2 内部
+        # 先解码成 PIL 再交给我们的一层转换；模式已是 RGB 就不再复制
+        raw = self.device.screenshot(format='raw')
+        img = Image.open(io.BytesIO(raw))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        w, h = img.size
+        crop_x, crop_y = w // 5, h // 5
+        img = img.crop((crop_x, crop_y, w * 4 // 5, h * 4 // 5))
+        cropped_w = img.width
+        img.thumbnail((1024, 1024), Image.LANCZOS)
+        ratio = cropped_w / img.width
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=75, optimize=True)
+        img_b64 = base64.b64encode(buffer.getvalue()).decode()
+
+        prompt = """这是一张手机屏幕截图。如果画面上有弹窗（红包、广告、更新提示等），
+请找到它的关闭按钮（通常是 X 图标或"我知道了"按钮），返回 JSON：
+{"found": true, "x": 像素横坐标, "y": 像素纵坐标}
+没有弹窗则返回 {"found": false}。只返回 JSON。"""
+
+        try:
+            response = _get_http_client().post(
+                f"{LLM_CONFIG['base_url']}/chat/completions",
+                headers={"Authorization": f"Bearer {LLM_CONFIG['api_key']}"},
+                json={
+                    "model": LLM_CONFIG["vl_model"],
+                    "messages": [{
+                        "role": "user",
+                        "content": [
+                            {"type": "image_url",
+                             "image_url": {"url": f"data:image/jpeg;base64,{img_b64}",
+                                           "detail": "low"}},
+                            {"type": "text", "text": prompt},
+                        ],
+                    }],
+                    "temperature": 0.1,
+                },
+            )
+            content = response.json()["choices"][0]["message"]["content"]
+            json_match = _JSON_OBJ_RE.search(content)
+            if json_match:
+                data = json.loads(json_match.group())
+                if data.get("found"):
+                    # 坐标从裁剪/缩放后的图片映射回设备像素
+                    dev_x = crop_x + int(int(data["x"]) * ratio)
+                    dev_y = crop_y + int(int(data["y"]) * ratio)
+                    self.device.click(dev_x, dev_y)
+                    self._invalidate_xml()
+                    print(f"[DEBUG] VL 关闭弹窗: ({dev_x}, {dev_y})")
+                    return True
+        except Exception as e:
+            print(f"[DEBUG] VL 弹窗识别失败: {e}")
+        return False
+
+    # ------------------------------------------------------------
+    # 流程步骤
+    # ------------------------------------------------------------
+
+    def launch_app(self):
+        """重启美团并清掉开屏弹窗"""
+        self.device.app_stop(MEITUAN_PACKAGE)
+        self.device.app_start(MEITUAN_PACKAGE)
+        self._wait(5)  # 开屏广告
+        if not self._try_dismiss_popup():
+            self._dismiss_with_vl()
+        self._wait(1)
+
+    def go_to_pinhaofan(self) -> bool:
+        """进入拼好饭入口"""
+        if not self._try_dismiss_popup():
+            self._dismiss_with_vl()
+        phf = self._wait_for_element(timeout=3, text="拼好饭")
+        if phf is None:
+            return False
+        phf.click()
+        self._wait(1.5)
+        return True
+
+    def search_meals(self, keyword: str, max_results: int = 3) -> list[MealInfo]:
+        """在拼好饭里搜索关键词并解析套餐"""
+        if not self._click_if_exists(timeout=2, text="search-input"):
+            self._click_if_exists(timeout=2, text="搜索")
+        self._wait(1)
+
+        input_field = self._wait_for_element(timeout=3, className="android.widget.EditText")
+        if input_field is not None:
+            input_field.set_text(keyword)
+            self._wait(0.5)
+            self.device.press("enter")
+        self._wait_stable()
+
+        return self._extract_search_results(keyword, max_results)
+
+    # ------------------------------------------------------------
+    # 结果解析
+    # ------------------------------------------------------------
+
+    def _extract_texts_from_xml(self, xml: str) -> list[tuple[int, str]]:
+        """从节点表里提取有效 (y, 文本)（过滤顶栏、纯数字和系统噪声）
+
+        带 y 坐标返回，便于下游按行聚类。
+        """
+        nodes = _parse_nodes(xml)
+
+        # SoA 预筛：大页面（搜索结果常有 300+ 文本节点）先用整型数组
+        # 一次性做掉 y 过滤，字符串判断只跑剩下的少数行
+        if np is not None and len(nodes) > 100:
+            ys = np.fromiter((n[2] for n in nodes), dtype=np.int32, count=len(nodes))
+            candidates = [nodes[i] for i in np.nonzero(ys > 350)[0]]
+        else:
+            candidates = [n for n in nodes if n[2] > 350]
+
+        texts = []
+        for text, _, y, _, _ in candidates:
+            if not text or len(text) <= 1:
+                continue
+            if _NUMERIC_RE.fullmatch(text):
+                continue
+            if any(sw in text for sw in _SKIP_WORDS):
+                continue
+            texts.append((y, text))
+        return texts
+
+    def _parse_meals_structurally(self, xml: str, max_results: int) -> list[MealInfo]:
+        """纯结构化解析：以价格节点为锚点在 y 邻域内拼卡片
+
+        搜索结果页的布局足够规整时根本不用问模型——价格上方最长的
+        普通文本是套餐名，同一邻域里的"XX分钟"是配送时长。只有每张
+        卡片都拼出了名字和价格才算可信，否则返回空列表交给 LLM。
+        """
+        nodes = _parse_nodes(xml)
+        anchors = [(text, y) for text, _, y, _, _ in nodes
+                   if text.startswith(('¥', '￥')) and y > 350]
+        meals = []
+        for price, py in anchors[:max_results]:
+            name = None
+            delivery = ""
+            for text, _, y, _, _ in nodes:
+                if not text or not (py - 350 <= y <= py + 80):
+                    continue
+                if '分钟' in text:
+                    delivery = text
+                elif (len(text) > 4
+                      and not text.startswith(('¥', '￥'))
+                      and not any(x in text for x in ('已拼', '收录', '免拼', 'km', '连锁'))):
+                    if name is None or len(text) > len(name):
+                        name = text
+            if name is None:
+                return []
+            meals.append(MealInfo(name=name, price=price, delivery_time=delivery))
+        return meals
+
+    def _extract_results_simple(self, xml: str, max_results: int) -> list[str]:
+        """结构化兜底：从同一张节点表里抓价格"""
+        prices = [
+            text.lstrip('¥￥')
+            for text, _, _, _, _ in _parse_nodes(xml)
+            if text.startswith(('¥', '￥'))
+        ]
+        return prices[:max_results]
+
+    def _parse_meals_with_llm(self, texts: list[tuple[int, str]], keyword: str,
+                              max_results: int) -> list[MealInfo]:
+        """把文本列表交给 LLM 解析成套餐结构
+
+        先按 y 坐标量化（80px 一档）聚成行，发送紧凑 JSON——行结构
+        已经给出，模型不用自己从平铺文本里猜分组，token 更少、输出
+        更稳。配合 response_format=json_object，兜底正则基本不再触发。
+        """
+        rows: dict[int, list[str]] = {}
+        for y, text in texts[:100]:
+            rows.setdefault(y // 80, []).append(text)
+        payload = json.dumps(
+            [{"row": k, "texts": v} for k, v in sorted(rows.items())],
+            ensure_ascii=False, separators=(',', ':'),
+        )
+        prompt = f"""下面是美团拼好饭搜索"{keyword}"后页面上的文本，已按屏幕行分组（row 越小越靠上）：
+
+{payload}
+
+请提取前{max_results}个与"{keyword}"相关的套餐，返回 JSON 对象：
+{{"meals": [{{"name": "套餐名", "price": "¥xx", "delivery_time": "xx分钟"}}]}}
+只返回 JSON。"""
+
+        try:
+            response = _get_http_client().post(
+                f"{LLM_CONFIG['base_url']}/chat/completions",
+                headers={"Authorization": f"Bearer {LLM_CONFIG['api_key']}"},
+                json={
+                    "model": LLM_CONFIG["model"],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.1,
+                    "response_format": {"type": "json_object"},
+                },
+            )
+            content = response.json()["choices"][0]["message"]["content"]
+            try:
+                meals = json.loads(content).get("meals", [])
+            except json.JSONDecodeError:
+                json_match = _JSON_OBJ_RE.search(content)
+                meals = json.loads(json_match.group()).get("meals", []) if json_match else []
+            return [
+                MealInfo(
+                    name=m.get("name", ""),
+                    price=m.get("price", ""),
+                    delivery_time=m.get("delivery_time", ""),
+                )
+                for m in meals[:max_results]
+            ]
+        except Exception as e:
+            print(f"[DEBUG] LLM 解析失败: {e}")
+        return []
+
+    def _extract_search_results(self, keyword: str, max_results: int) -> list[MealInfo]:
+        """解析搜索结果页：结构化优先，歧义页面才走 LLM，价格兜底"""
+        self._wait_stable()
+        xml = self._hierarchy()
+
+        # LLM 请求先在后台线程发出去，与本地结构化解析并行；
+        # 结构化凑够数就取消（还在排队）或丢弃它的结果
+        texts = self._extract_texts_from_xml(xml)
+        llm_future = _PARSE_POOL.submit(
+            self._parse_meals_with_llm, texts, keyword, max_results
+        )
+
+        meals = self._parse_meals_structurally(xml, max_results)
+        if len(meals) >= max_results:
+            llm_future.cancel()
+            return meals
+
+        meals = llm_future.result()
+        if meals:
+            return meals
+
+        # LLM 失败时至少给出价格
+        prices = self._extract_results_simple(xml, max_results)
+        return [MealInfo(name="", price=f"¥{p}", delivery_time="") for p in prices]
+
+    # ------------------------------------------------------------
+    # 下单与订单状态
+    # ------------------------------------------------------------
+
+    def place_order(self, meal_name: str) -> dict:
+        """从搜索结果进入详情并抢到支付页，返回最终价格"""
+        if not self._click_if_exists(timeout=3, textContains=meal_name):
+            return {"success": False, "error": f"未找到套餐: {meal_name}"}
+        self._wait(2)
+
+        self._click_if_exists(timeout=3, textContains="马上抢")
+        self._wait(2)
+        self._click_if_exists(timeout=3, textContains="马上抢")
+
+        # 等待支付页
+        pay = self._wait_for_element(timeout=5, text="极速支付")
+        if pay is None:
+            return {"success": False, "error": "未到达支付页面"}
+
+        # 走带缓存的 _hierarchy：这帧还能喂给紧接着的
+        # check_order_status，不用再 dump 一次
+        xml = self._hierarchy()
+        prices = [
+            (y, text) for text, _, y, _, _ in _parse_nodes(xml)
+            if text.startswith(('¥', '￥'))
+        ]
+        prices.sort()
+        final_price = prices[-1][1] if prices else ""
+        return {"success": True, "meal_name": meal_name, "final_price": final_price}
+
+    def check_order_status(self) -> dict:
+        """读取当前订单页的状态关键词和进度描述"""
+        xml = self._hierarchy()
+
+        # 一遍 finditer 收齐所有命中，再按流程优先级挑最靠前的状态
+        # （保持旧逐词循环的优先级语义，而不是谁在 dump 里先出现谁赢）
+        hits = {m.lastgroup for m in _STATUS_RE.finditer(xml)}
+        status = None
+        for value in ("pending_payment", "accepted", "picked_up",
+                      "delivering", "delivered", "cancelled"):
+            if value in hits:
+                status = value
+                break
+
+        progress = None
+        m = _PROGRESS_RE.search(xml)
+        if m:
+            progress = m.group()
+
+        eta = None
+        m = _TIME_RE.search(xml)
+        if m:
+            eta = m.group(1)
+
+        return {"status": status, "progress": progress, "eta": eta}
+
+    # ------------------------------------------------------------
+    # 通知栏
+    # ------------------------------------------------------------
+
+    def open_notification_panel(self):
+        """下拉打开通知栏"""
+        self.device.open_notification()
+        self._wait(0.5)
+
+    def close_notification_panel(self):
+        """收起通知栏"""
+        self.device.press("back")
+        self._wait(0.3)
+
+    @contextmanager
+    def _notification(self):
+        """通知栏上下文：进入时下拉、退出时保证收起
+
+        连续读取合并进同一次 open/close，省掉每次读取各一趟
+        下拉动画 + back 键等待。
+        """
+        self.open_notification_panel()
+        try:
+            yield
+        finally:
+            self.close_notification_panel()
+
+    def _read_notification_texts(self) -> list[str]:
+        """读当前通知栏的 TextView 文本（假定通知栏已打开）"""
+        xml = self.device.dump_hierarchy()
+        root = etree.fromstring(xml.encode('utf-8'))
+        return [
+            t for t in root.xpath("//node[@class='android.widget.TextView']/@text")
+            if t
+        ]
+
+    def get_notification_texts(self) -> list[str]:
+        """读取通知栏里的所有文本
+
+        一次 dump + XPath 本地取全部 TextView 文本；逐元素
+        exists/get_text 的写法每条通知要打两次 RPC。
+        """
+        with self._notification():
+            return self._read_notification_texts()
+
+    def get_notification_texts_many(self, n: int, interval: float = 1.0) -> list[list[str]]:
+        """连续采样 n 次通知栏文本，整个过程只开合一次通知栏"""
+        snapshots = []
+        with self._notification():
+            for i in range(n):
+                snapshots.append(self._read_notification_texts())
+                if i + 1 < n:
+                    time.sleep(interval)
+        return snapshots
+
+
+if __name__ == "__main__":
+    import sys
+
+    keyword = sys.argv[1] if len(sys.argv) > 1 else "牛肉面"
+    bot = MeituanAutomation()
+    bot.launch_app()
+    if bot.go_to_pinhaofan():
+        meals = bot.search_meals(keyword)
+        for i, meal in enumerate(meals, 1):
+            print(f"{i}. {meal.name} | {meal.price} | {meal.delivery_time}")
+    else:
+        print("未找到拼好饭入口")
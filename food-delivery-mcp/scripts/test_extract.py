@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""测试从 UI 层级 XML 中提取搜索结果
+
+不依赖 DroidRun Portal，直接用 uiautomator dump 拿到层级 XML，
+正则提取有效文本后交给 LLM 分析套餐信息。
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import re
+import subprocess
+import sys
+
+# 禁用代理
+for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
+    os.environ.pop(key, None)
+
+import httpx
+
+from io import BytesIO
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    # lxml 不可用时退回标准库（同样是 C 级解析）
+    import xml.etree.ElementTree as ET
+
+# LLM 配置
+LLM_CONFIG = {
+    "api_key": "sk-8ca63b6b547c429ba348eeb131ae1bd0",
+    "base_url": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    "model": "qwen-plus",
+}
+
+# 模块级复用的 HTTP 客户端：TLS 握手和连接池跨多轮 LLM 调用复用
+_CLIENT = httpx.Client(timeout=60, trust_env=False)
+atexit.register(_CLIENT.close)
+
+# 无意义的系统/框架文本，提取时跳过
+skip_words = frozenset({'android.widget', 'android.view', 'mmp-', 'com.sankuai'})
+
+# 热路径正则预编译
+_TEXT_BOUNDS = re.compile(r'text="([^"]+)"[^>]*bounds="\[(\d+),(\d+)\]')
+_PURE_NUM = re.compile(r'^[\d.:]+$')
+
+
+def dump_hierarchy() -> str:
+    """通过 uiautomator dump 获取当前页面层级 XML
+
+    dump 和 cat 合并为一次 adb shell 调用，省掉一轮 ADB 往返。
+    """
+    result = subprocess.run(
+        ["adb", "shell", "uiautomator dump /sdcard/u.xml >/dev/null && cat /sdcard/u.xml"],
+        capture_output=True, text=True,
+    )
+    return result.stdout
+
+
+async def dump_hierarchy_async() -> str:
+    """dump_hierarchy 的异步版，便于与其他 ADB 操作并发"""
+    proc = await asyncio.create_subprocess_exec(
+        "adb", "shell", "uiautomator dump /sdcard/u.xml >/dev/null && cat /sdcard/u.xml",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    return stdout.decode(errors='replace')
+
+
+async def save_debug_files(prefix: str = "debug"):
+    """并发抓取截图和层级 XML 并保存
+
+    两者是互不依赖的 ADB 操作，gather 并发执行可把墙钟时间砍半。
+    """
+    screencap = await asyncio.create_subprocess_exec(
+        "adb", "exec-out", "screencap", "-p",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    (png_bytes, _), xml = await asyncio.gather(
+        screencap.communicate(),
+        dump_hierarchy_async(),
+    )
+
+    png_file = f"{prefix}_screen.png"
+    xml_file = f"{prefix}_hierarchy.xml"
+    with open(png_file, 'wb') as f:
+        f.write(png_bytes)
+    with open(xml_file, 'w', encoding='utf-8') as f:
+        f.write(xml)
+    print(f"已保存: {png_file}, {xml_file}")
+    return xml
+
+
+def _keep_text(text: str, y: int) -> bool:
+    """过滤规则：跳过顶部区域（y <= 350）、纯数字噪声和系统文本"""
+    if y <= 350:
+        return False
+    # 纯数字/时间样式的碎片单独无意义
+    if _PURE_NUM.match(text):
+        return False
+    return not any(sw in text for sw in skip_words)
+
+
+def extract_texts_from_xml(xml: str) -> list[dict]:
+    """从层级 XML 中提取有效文本及其位置
+
+    用 iterparse 做一次 C 级流式遍历（边读边 clear，不保留整棵树），
+    XML 不完整时退回正则扫描。
+    """
+    try:
+        texts = []
+        for _, el in ET.iterparse(BytesIO(xml.encode('utf-8')), events=('start',)):
+            text = el.get('text')
+            if text:
+                bounds = el.get('bounds', '')
+                try:
+                    x_str, y_str = bounds[1:].split(']', 1)[0].split(',')
+                    x, y = int(x_str), int(y_str)
+                except ValueError:
+                    x = y = 0
+                if _keep_text(text, y):
+                    texts.append({'text': text, 'pos': [x, y]})
+            el.clear()
+        return texts
+    except Exception:
+        # dump 被截断等导致解析失败时，退回正则扫描
+        return [
+            {'text': m.group(1), 'pos': [int(m.group(2)), int(m.group(3))]}
+            for m in _TEXT_BOUNDS.finditer(xml)
+            if _keep_text(m.group(1), int(m.group(3)))
+        ]
+
+
+def call_llm(texts: list[dict], keyword: str) -> str:
+    """把提取的文本交给 LLM 分析套餐信息"""
+    # 紧凑 JSON（无缩进 + 紧凑分隔符），payload 截断到前 100 条：
+    # LLM 延迟和费用随 token 数线性增长，这里是整个脚本的大头
+    payload = json.dumps(texts[:100], ensure_ascii=False, separators=(',', ':'))
+
+    prompt = f"""下面是美团外卖搜索"{keyword}"后页面上的文本元素（text 为文本，pos 为左上角坐标 [x,y]）：
+
+{payload}
+
+请提取前3个与"{keyword}"相关的套餐，输出 JSON：
+{{"meals": [{{"name": "套餐名称", "price": "价格", "delivery_time": "配送时间"}}]}}
+
+注意：pos 的 y 坐标相近的元素属于同一个套餐卡片；只返回 JSON。
+"""
+
+    response = _CLIENT.post(
+        f"{LLM_CONFIG['base_url']}/chat/completions",
+        headers={"Authorization": f"Bearer {LLM_CONFIG['api_key']}"},
+        json={
+            "model": LLM_CONFIG["model"],
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1,
+        },
+    )
+    data = response.json()
+    return data["choices"][0]["message"]["content"]
+
+
+def main():
+    """交互循环：回车刷新提取，输入关键词后调用 LLM 分析"""
+    # snap 子命令：并发抓取截图+层级用于调试
+    if len(sys.argv) > 1 and sys.argv[1] == "snap":
+        asyncio.run(save_debug_files())
+        return
+
+    keyword = sys.argv[1] if len(sys.argv) > 1 else "牛肉面"
+
+    while True:
+        xml = dump_hierarchy()
+        texts = extract_texts_from_xml(xml)
+
+        print("=" * 60)
+        print(f"提取到 {len(texts)} 条有效文本:")
+        sys.stdout.write("".join(f"  {t['pos']} {t['text']}\n" for t in texts))
+
+        result = call_llm(texts, keyword)
+        print("=" * 60)
+        print("LLM 分析结果:")
+        print(result)
+
+        cmd = input("\n回车重新提取，输入新关键词切换，q 退出: ").strip()
+        if cmd == 'q':
+            break
+        if cmd:
+            keyword = cmd
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""测试手机通知监控
+
+用于检测美团外卖的送达通知（支付后 App 会被关闭，通知会出现在通知栏）。
+提供三种方式：
+- dumpsys: 一次性解析 dumpsys notification 输出
+- logcat: 流式监听 NotificationService 日志
+- monitor: 后台轮询监控，发现新的外卖通知时回调
+"""
+
+import asyncio
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# 外卖相关通知的关键词
+DELIVERY_KEYWORDS = ["已送达", "送达", "骑手", "外卖", "订单", "取餐"]
+
+# 已知的外卖 App 包名：O(1) 包名判断优先，命中就不用再扫正文
+_DELIVERY_PKGS = frozenset({
+    "com.sankuai.meituan.takeoutnew",
+    "com.sankuai.meituan",
+    "me.ele",
+})
+
+
+def _compile_keywords(keywords: list[str]) -> "re.Pattern[str]":
+    """把关键词列表编译为单个交替式正则，一次 search 替代逐词 in 扫描"""
+    return re.compile('|'.join(re.escape(k) for k in keywords))
+
+# 模块级预编译正则。各字段合并为一个命名分组的交替式，
+# 每条记录只需一次 finditer 线性扫描，而不是每个字段各扫一遍
+_FIELD_RE = re.compile(
+    r'pkg=(?P<package>\S+)'
+    r'|key=(?P<key>[^\s:]+)'
+    r'|when=(?P<when>\d+)'
+    r'|android\.title=String \((?P<title>[^)]*)\)'
+    r'|android\.text=String \((?P<text>[^)]*)\)'
+    r'|tickerText=(?P<ticker>[^\n]+)'
+)
+_LIST_RE = re.compile(r'Notification List:\s*\n(.*?)(?=\n  \w|\Z)', re.DOTALL)
+_SPLIT_RE = re.compile(r'(?=NotificationRecord\()')
+_DELIVERY_KW_RE = _compile_keywords(DELIVERY_KEYWORDS)
+
+
+@dataclass(slots=True)
+class NotificationInfo:
+    """一条通知的关键信息
+
+    slots=True 去掉实例 __dict__：监控轮询会反复创建大量实例，
+    这样占用更小、属性访问也更快。
+    """
+    package: str = ""
+    key: str = ""
+    when: str = ""
+    title: str = ""
+    text: str = ""
+    ticker: str = ""
+
+
+def _run_adb(cmd: list[str], timeout: float = 10.0) -> str:
+    """执行 ADB 命令并返回输出"""
+    try:
+        result = subprocess.run(
+            ["adb"] + cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        return result.stdout
+    except Exception as e:
+        print(f"ADB 命令失败: {e}")
+        return ""
+
+
+class AdbShellPool:
+    """长驻 adb shell 会话
+
+    轮询监控每隔几秒就要跑一次 dumpsys，每次 fork adb + 重建 shell
+    是主要开销。这里保持一个 adb shell 子进程，用 sentinel 分隔各条
+    命令的输出；会话断开时退回一次性 subprocess.run。
+    """
+
+    _SENTINEL = "__END__"
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def exec(self, cmd: str) -> str:
+        """在长驻会话中执行一条 shell 命令"""
+        with self._lock:
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._proc = subprocess.Popen(
+                        ["adb", "shell"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                    )
+                self._proc.stdin.write(f"{cmd}\necho {self._SENTINEL}:$?\n")
+                self._proc.stdin.flush()
+
+                lines = []
+                for line in self._proc.stdout:
+                    if line.startswith(self._SENTINEL):
+                        return ''.join(lines)
+                # EOF：会话断了，下次重建；本次退回一次性调用
+                self._proc = None
+            except OSError:
+                self._proc = None
+        return _run_adb(["shell"] + cmd.split())
+
+
+_pool = AdbShellPool()
+
+
+def parse_notifications_from_dumpsys(output: str) -> list[NotificationInfo]:
+    """从 dumpsys notification 输出中解析通知列表"""
+    notifications = []
+
+    # 定位 Notification List 区域（找不到就扫描全文）
+    list_match = _LIST_RE.search(output)
+    section = list_match.group(1) if list_match else output
+
+    for record in _SPLIT_RE.split(section):
+        if 'NotificationRecord(' not in record:
+            continue
+
+        # 一次线性扫描收齐所有字段（保留每个字段的首次出现）
+        fields = {}
+        for m in _FIELD_RE.finditer(record):
+            name = m.lastgroup
+            if name not in fields:
+                fields[name] = m.group(name)
+        if 'ticker' in fields:
+            fields['ticker'] = fields['ticker'].strip()
+
+        notifications.append(NotificationInfo(**fields))
+
+    return notifications
+
+
+def test_method_dumpsys():
+    """方式1: 一次性解析 dumpsys notification"""
+    print("=" * 60)
+    print("dumpsys notification 解析")
+    print("=" * 60)
+
+    output = _run_adb(["shell", "dumpsys", "notification", "--noredact"])
+    notifications = parse_notifications_from_dumpsys(output)
+    print(f"共解析到 {len(notifications)} 条通知")
+
+    # 汇总后一次性输出，避免逐条 print 的 stdio 锁和刷新开销
+    lines = []
+    for n in notifications:
+        if n.package in _DELIVERY_PKGS or _DELIVERY_KW_RE.search(f"{n.title} {n.text} {n.ticker}"):
+            lines.append(f"[外卖通知] pkg={n.package}")
+            lines.append(f"  标题: {n.title}")
+            lines.append(f"  内容: {n.text}")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+async def method_logcat_stream(duration: float = 60.0):
+    """方式2: 流式监听 NotificationService 日志
+
+    异步子进程 + 非阻塞 readline，不占用独立线程，
+    超时到点立即返回而不是等下一行日志。
+
+    Args:
+        duration: 监听时长（秒）
+    """
+    print("=" * 60)
+    print(f"logcat 流式监听 ({duration}s)")
+    print("=" * 60)
+
+    proc = await asyncio.create_subprocess_exec(
+        "adb", "logcat", "-v", "time", "NotificationService:*", "*:S",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    deadline = time.monotonic() + duration
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                line_bytes = await asyncio.wait_for(proc.stdout.readline(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if not line_bytes:
+                break
+            line = line_bytes.decode(errors='replace')
+            if _DELIVERY_KW_RE.search(line):
+                print(f"[外卖日志] {line.strip()}")
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+
+class BackgroundNotificationMonitor:
+    """后台通知监控
+
+    定期轮询 dumpsys notification，发现新的外卖相关通知时触发回调。
+    """
+
+    def __init__(self, keywords: list[str] = None, check_interval: float = 2.0,
+                 callback=None):
+        """初始化
+
+        Args:
+            keywords: 匹配关键词列表（默认 DELIVERY_KEYWORDS）
+            check_interval: 轮询间隔（秒）
+            callback: 发现新通知时的回调 callback(NotificationInfo)
+        """
+        self.keywords = keywords or DELIVERY_KEYWORDS
+        self._kw_re = _compile_keywords(self.keywords)
+        self.check_interval = check_interval
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._task: "asyncio.Task | None" = None
+        # 有界 FIFO：OrderedDict 按插入序 O(1) 淘汰最旧的 key
+        self._seen_keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def _check_notifications(self):
+        """检查一轮通知（同步版，走长驻 shell 会话）"""
+        output = _pool.exec("dumpsys notification --noredact")
+        self._handle_notifications(parse_notifications_from_dumpsys(output))
+
+    async def _check_notifications_async(self):
+        """检查一轮通知（异步版，dumpsys 走 asyncio 子进程不阻塞事件循环）"""
+        proc = await asyncio.create_subprocess_exec(
+            "adb", "shell", "dumpsys", "notification", "--noredact",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await proc.communicate()
+        output = stdout.decode(errors='replace')
+        self._handle_notifications(parse_notifications_from_dumpsys(output))
+
+    def _handle_notifications(self, notifications: list[NotificationInfo]):
+        """对一轮解析结果做关键词过滤、去重和回调"""
+        for n in notifications:
+            # 先查包名（O(1)），未知包名才拼接正文跑正则
+            if n.package not in _DELIVERY_PKGS and not self._kw_re.search(f"{n.title} {n.text}"):
+                continue
+
+            unique_key = n.key or f"{n.package}:{n.when}"
+            if unique_key in self._seen_keys:
+                continue
+            self._seen_keys[unique_key] = None
+
+            # 防止无限增长，按插入序淘汰最旧的 key
+            while len(self._seen_keys) > 100:
+                self._seen_keys.popitem(last=False)
+
+            print(f"[新通知] {n.title}: {n.text}")
+            if self.callback:
+                self.callback(n)
+
+    async def _loop_async(self):
+        """监控主循环（异步版）"""
+        while True:
+            try:
+                await self._check_notifications_async()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"监控出错: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def start_async(self):
+        """在当前事件循环中启动监控（异步调用方用这个，不占线程）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop_async())
+            print(f"后台监控已启动（异步，间隔 {self.check_interval}s）")
+
+    async def stop_async(self):
+        """停止异步监控"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        print("后台监控已停止")
+
+    def _loop(self):
+        """监控主循环（线程版，供非异步调用方使用）"""
+        while not self._stop.is_set():
+            try:
+                self._check_notifications()
+            except Exception as e:
+                print(f"监控出错: {e}")
+            # Event.wait 代替 sleep：stop() 时立即返回，不用等完整个间隔
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        """启动后台监控"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print(f"后台监控已启动（间隔 {self.check_interval}s）")
+
+    def stop(self):
+        """停止后台监控"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        print("后台监控已停止")
+
+
+def test_background_monitor():
+    """方式3: 后台轮询监控（运行 20 秒）"""
+    print("=" * 60)
+    print("后台轮询监控")
+    print("=" * 60)
+
+    received = []
+    monitor = BackgroundNotificationMonitor(callback=received.append)
+    monitor.start()
+
+    try:
+        for _ in range(20):
+            if monitor._stop.wait(1):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+
+    print(f"共收到 {len(received)} 条新通知")
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "dumpsys"
+
+    if cmd == "dumpsys":
+        test_method_dumpsys()
+    elif cmd == "logcat":
+        duration = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+        asyncio.run(method_logcat_stream(duration))
+    elif cmd == "monitor":
+        test_background_monitor()
+    else:
+        print("用法: python test_notification_monitor.py [dumpsys|logcat|monitor]")
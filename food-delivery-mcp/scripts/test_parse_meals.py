@@ -6,6 +6,11 @@ import json
 import os
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 禁用代理
 for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
     os.environ.pop(key, None)
@@ -17,6 +22,21 @@ LLM_CONFIG = {
     "model": "qwen-max",
 }
 
+# 复用的 OpenAI 客户端（懒初始化，连接池/TLS 会话跨调用复用）
+_client = None
+
+
+def _get_openai_client():
+    """获取模块级 OpenAI 客户端单例"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(
+            api_key=LLM_CONFIG["api_key"],
+            base_url=LLM_CONFIG["base_url"],
+        )
+    return _client
+
 
 async def test_parse():
     """测试解析当前页面的套餐信息"""
@@ -30,26 +50,23 @@ async def test_parse():
     
     keyword = "辣椒炒肉"
     
-    # 构建完整的元素列表（包含所有信息）
-    elements_for_llm = []
-    for el in elements:
-        text = el.get('text', '')
-        bounds = el.get('bounds', '')
-        idx = el.get('index', 0)
-        # 保留所有有文本的元素
-        if text and len(text.strip()) > 0:
-            elements_for_llm.append({
-                'index': idx,
-                'text': text,
-                'bounds': bounds
-            })
+    # 构建完整的元素列表（包含所有信息）——一次遍历抽字段再过滤
+    rows = [
+        (el.get('text', ''), el.get('index', 0), el.get('bounds', ''))
+        for el in elements
+    ]
+    elements_for_llm = [
+        {'index': idx, 'text': text, 'bounds': bounds}
+        for text, idx, bounds in rows
+        if text and text.strip()
+    ]
     
     print("=" * 60)
     print(f"共 {len(elements_for_llm)} 个有文本的元素")
     print("=" * 60)
     
-    # 转为 JSON 字符串
-    elements_json = json.dumps(elements_for_llm, ensure_ascii=False, indent=2)
+    # 转为紧凑 JSON 字符串（缩进会把 token 数放大 3-4 倍，直接拉高 LLM 延迟和费用）
+    elements_json = json.dumps(elements_for_llm, ensure_ascii=False, separators=(',', ':'))
     
     prompt = f"""你是一个美团外卖搜索结果分析助手。下面是搜索"{keyword}"后的页面元素列表，每个元素包含 index（序号）、text（文本）、bounds（位置坐标 x1,y1,x2,y2）。
 
@@ -88,12 +105,7 @@ async def test_parse():
     print(prompt[:1000] + "...\n[内容已截断]")
     
     # 调用 LLM
-    from openai import OpenAI
-    
-    client = OpenAI(
-        api_key=LLM_CONFIG["api_key"],
-        base_url=LLM_CONFIG["base_url"],
-    )
+    client = _get_openai_client()
     
     response = client.chat.completions.create(
         model=LLM_CONFIG["model"],
@@ -111,7 +123,8 @@ async def test_parse():
     # 解析 JSON
     json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
     if json_match:
-        result_json = json.loads(json_match.group())
+        raw = json_match.group()
+        result_json = orjson.loads(raw) if orjson is not None else json.loads(raw)
         print("\n" + "=" * 60)
         print("解析后的套餐信息:")
         print("=" * 60)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""测试美团拼好饭搜索流程（uiautomator2 版）
+
+不走 DroidRun Agent，直接用 uiautomator2 驱动固定流程：
+打开美团 → 关弹窗 → 进拼好饭 → 搜索关键词 → 解析套餐卡片。
+每一步保存截图和层级 XML 到 search_flow_debug/ 便于排查。
+"""
+
+import bisect
+import concurrent.futures
+import functools
+import itertools
+import re
+import sys
+import time
+from pathlib import Path
+
+import uiautomator2 as u2
+
+try:
+    from lxml import etree as _ET
+except ImportError:
+    # lxml 不可用时退回标准库（同样是 C 级解析）
+    import xml.etree.ElementTree as _ET
+
+# 美团外卖包名
+MEITUAN_PACKAGE = "com.sankuai.meituan.takeoutnew"
+
+# 调试输出目录
+DEBUG_DIR = Path(__file__).parent / "search_flow_debug"
+
+# 调试文件序号：递增计数器代替每次 datetime.now().strftime，
+# 文件名依旧按时间顺序排列
+_SEQ = itertools.count()
+
+# 调试文件的磁盘写入丢到后台线程，主流程不等落盘就继续驱动设备
+_IO = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+# 常见弹窗的关闭按钮：合并为一个 textMatches 交替式，
+# 一次 RPC 就能命中任意一种按钮，而不是每个候选各等 0.5s
+POPUP_TEXT_PATTERN = "我知道了|关闭|取消|暂不|以后再说|下次再说|不用了"
+POPUP_KEYWORDS = ("我知道了", "关闭", "取消", "暂不", "以后再说", "下次再说", "不用了")
+
+# 诊断输出用：从 dump 里本地取 TextView 文本，
+# 代替每个元素一次 get_text() RPC
+_TEXTVIEW_TEXT_RE = re.compile(r'class="android\.widget\.TextView"[^>]*text="([^"]+)"')
+
+# 卡片分类用的常量：热循环里不要每条文本都重建 list
+_PRICE_PREFIXES = ('¥', '￥')
+_LABEL_BLACKLIST = ('已拼', '分钟', '¥', '￥', '收录', '免拼', 'km', '连锁')
+
+
+def _scan_xml_fallback(xml: str, rows: list, prices: list, rids: list):
+    """截断 dump 的兜底扫描：纯 str.find 单遍走完
+
+    str.find 是 C 实现的双向子串搜索，在多 KB 输入上比正则快且
+    没有分组捕获开销；每个属性只做一次切片。
+    """
+    i = 0
+    while True:
+        i = xml.find('text="', i)
+        if i < 0:
+            break
+        j = xml.find('"', i + 6)
+        if j < 0:
+            break
+        text = xml[i + 6:j]
+        node_end = xml.find('>', j)
+        b = xml.find('bounds="[', j)
+        if text and 0 <= b and (node_end < 0 or b < node_end):
+            k = xml.find(']', b + 9)
+            if k > 0:
+                coords = xml[b + 9:k].split(',')
+                try:
+                    y = int(coords[1])
+                except (IndexError, ValueError):
+                    y = None
+                if y is not None:
+                    rows.append((text, y))
+                    if text[0] in '¥￥':
+                        prices.append(text.lstrip('¥￥'))
+        i = j + 1
+    i = 0
+    while True:
+        i = xml.find('resource-id="', i)
+        if i < 0:
+            break
+        j = xml.find('"', i + 13)
+        if j < 0:
+            break
+        rid = xml[i + 13:j]
+        if rid:
+            rids.append(rid)
+        i = j + 1
+
+
+@functools.lru_cache(maxsize=4)
+def _scan_xml(xml: str) -> tuple[tuple, tuple, tuple]:
+    """一遍扫描同时收集 (文本, y) 行、价格数字和 resource-id
+
+    优先按 XML 正经解析（C 级属性访问，O(节点)），dump 被截断等
+    解析失败时退回纯字符串扫描。结果按 XML 字符串 lru_cache：
+    主提取和兜底价格列表用的是同一份 dump，第二次调用零开销。
+
+    Returns:
+        (rows, prices, rids)：rows 已按 y 升序排序
+    """
+    rows = []
+    prices = []
+    rids = []
+    try:
+        for node in _ET.fromstring(xml.encode('utf-8')).iter():
+            rid = node.get('resource-id')
+            if rid:
+                rids.append(rid)
+            text = node.get('text')
+            if not text:
+                continue
+            bounds = node.get('bounds', '')
+            try:
+                y = int(bounds[1:].split(']', 1)[0].split(',')[1])
+            except (ValueError, IndexError):
+                continue
+            rows.append((text, y))
+            if text[0] in '¥￥':
+                prices.append(text.lstrip('¥￥'))
+    except Exception:
+        rows.clear()
+        prices.clear()
+        rids.clear()
+        _scan_xml_fallback(xml, rows, prices, rids)
+    rows.sort(key=lambda r: r[1])
+    # 元组返回：缓存命中时共享同一份不可变结果
+    return tuple(rows), tuple(prices), tuple(rids)
+
+
+def _window_indices(sorted_ys: list[int], price_ys: list[int],
+                    lo_delta: int = 350, hi_delta: int = 80) -> list[tuple[int, int]]:
+    """计算每个价格锚点的窗口切片下标 [lo, hi)
+
+    纯整数二分阶段，与字符串提取解耦；锚点通常只有个位数，
+    Python 级 bisect 足够快。
+    """
+    return [
+        (bisect.bisect_left(sorted_ys, py - lo_delta),
+         bisect.bisect_right(sorted_ys, py + hi_delta))
+        for py in price_ys
+    ]
+
+
+def save_xml(device, step_name: str) -> str:
+    """保存当前层级 XML，返回 XML 内容"""
+    DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+    xml = device.dump_hierarchy()
+    filepath = DEBUG_DIR / f"{next(_SEQ):03d}_{step_name}.xml"
+    _IO.submit(filepath.write_text, xml, encoding='utf-8')
+    print(f"[DEBUG] 已保存: {filepath}")
+    return xml
+
+
+def save_screenshot(device, step_name: str):
+    """保存当前屏幕截图"""
+    DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+    filepath = DEBUG_DIR / f"{next(_SEQ):03d}_{step_name}.png"
+    # 截图在设备侧生成，拿到字节后由后台线程落盘
+    data = device.screenshot(format='raw')
+    _IO.submit(filepath.write_bytes, data)
+    print(f"[DEBUG] 已保存: {filepath}")
+
+
+def wait_and_save(device, step_name: str, wait: float = 1.0) -> str:
+    """等待页面稳定后保存截图和层级，返回 XML"""
+    time.sleep(wait)
+    save_screenshot(device, step_name)
+    return save_xml(device, step_name)
+
+
+def dismiss_popups(device, max_attempts: int = 3):
+    """尝试关闭弹窗（红包、更新提示等）
+
+    每轮先 dump 一次层级做纯 Python 子串预检——没有任何候选关键词时
+    直接返回，一个 RPC 都不发；命中后才用合并的 textMatches 查询定位。
+    """
+    for attempt in range(max_attempts):
+        xml = device.dump_hierarchy()
+        if not any(k in xml for k in POPUP_KEYWORDS):
+            return
+        elem = device(textMatches=POPUP_TEXT_PATTERN)
+        if not elem.wait(timeout=0.8):
+            elem = device(description="关闭")
+            if not elem.wait(timeout=0.5):
+                return
+        elem.click()
+        print("[DEBUG] 关闭弹窗")
+        time.sleep(1)
+
+
+def extract_meal_cards(device, max_results: int = 5, xml: str | None = None) -> list[dict]:
+    """从搜索结果页提取套餐卡片
+
+    以价格元素（¥ 开头）的 y 坐标为锚点，把上下窗口内的文本归入同一卡片：
+    最长的非标签文本当名称，"XX分钟"当配送时间。
+
+    Args:
+        xml: 已有的层级 XML（如 wait_and_save 的返回值）；传入时跳过
+            再一次 dump_hierarchy——那通常是最重的一次 u2 RPC。
+    """
+    if xml is None:
+        xml = device.dump_hierarchy()
+
+    # 一遍扫描 + 按 y 排序；每个锚点用二分取窗口切片，
+    # 代替对全部文本的逐卡片线性扫描（O(卡片×文本) → O(N log N + 窗口)）
+    rows, _, _ = _scan_xml(xml)
+    sorted_ys = [r[1] for r in rows]
+
+    # 价格锚点
+    card_y_positions = [y for text, y in rows if text.startswith(_PRICE_PREFIXES)]
+
+    cards = []
+    windows = _window_indices(sorted_ys, card_y_positions[:max_results])
+    for lo, hi in windows:
+        name = None
+        price = None
+        delivery_time = None
+        for text, y in rows[lo:hi]:
+            if text.startswith(_PRICE_PREFIXES):
+                if price is None:
+                    price = text
+            elif '分钟' in text:
+                delivery_time = text
+            elif len(text) > 4 and not any(x in text for x in _LABEL_BLACKLIST):
+                # 窗口内最长的普通文本通常是套餐名
+                if name is None or len(text) > len(name):
+                    name = text
+
+        if name:
+            cards.append({
+                'name': name,
+                'price': price or '',
+                'delivery_time': delivery_time or '',
+            })
+
+    return cards
+
+
+def main():
+    """执行完整搜索流程"""
+    keyword = sys.argv[1] if len(sys.argv) > 1 else "牛肉面"
+
+    d = u2.connect()
+    print(f"已连接设备: {d.serial}")
+
+    # 步骤 1: 重启美团
+    d.app_stop(MEITUAN_PACKAGE)
+    d.app_start(MEITUAN_PACKAGE)
+    print("等待 5 秒（广告）...")
+    time.sleep(5)
+    wait_and_save(d, "01_home", 1)
+
+    # 步骤 2: 关闭弹窗
+    dismiss_popups(d)
+    wait_and_save(d, "02_after_popups", 1)
+
+    # 步骤 3: 进入拼好饭
+    phf = d(text="拼好饭")
+    if phf.wait(timeout=3):
+        phf.click()
+    wait_and_save(d, "03_phf", 2)
+
+    # 步骤 4: 搜索关键词
+    search_box = d(text="search-input")
+    if not search_box.wait(timeout=2):
+        search_box = d(text="搜索")
+    if search_box.exists:
+        search_box.click()
+        time.sleep(1)
+
+    input_field = d(className="android.widget.EditText")
+    if input_field.wait(timeout=3):
+        input_field.set_text(keyword)
+        time.sleep(1)
+        d.press("enter")
+    wait_and_save(d, "04_search", 2)
+
+    # 步骤 5: 提取搜索结果（复用保存调试文件时 dump 的 XML）
+    dismiss_popups(d)
+    last_xml = wait_and_save(d, "05_after_popups", 1)
+    cards = extract_meal_cards(d, xml=last_xml)
+
+    if cards:
+        print("=" * 60)
+        print(f"提取到 {len(cards)} 个套餐:")
+        for i, card in enumerate(cards, 1):
+            print(f"{i}. {card['name']} | {card['price']} | {card['delivery_time']}")
+    else:
+        # 兜底：至少把价格抓出来（同一遍扫描的副产物，复用同一份 XML）
+        _, prices, _ = _scan_xml(last_xml)
+        print(f"未解析出完整卡片，页面上的价格: {prices}")
+
+        # 诊断：打印页面上的文本元素（一次 dump 本地解析，
+        # 代替每个 TextView 一次 get_text RPC）
+        print("页面上的文本元素:")
+        for text in _TEXTVIEW_TEXT_RE.findall(last_xml):
+            if len(text) < 30:
+                print(f"  {text}")
+
+
+if __name__ == "__main__":
+    main()
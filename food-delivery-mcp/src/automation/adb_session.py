@@ -0,0 +1,136 @@
+"""常驻 adb shell 会话
+
+每条 shell 命令各 fork 一个 adb 客户端要重复付进程启动 + 到 daemon 的
+TCP 连接 + host:transport 的开销（~50-300ms）；这里只开一次
+`adb shell`，后续命令写进管道、按哨兵行切分输出，shell 类命令只剩
+管道开销。EOF 时关掉进程，下一条命令惰性重建。
+
+同步代码用 SyncAdbSession（线程锁防交错），协程代码用
+AsyncAdbSession（asyncio.Lock，读写不阻塞事件循环）。
+"""
+
+import asyncio
+import logging
+import subprocess
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# 命令结束标记：附带退出码回显，readline 扫到即认为输出完整
+_SENTINEL = "__END__"
+
+
+def _build_argv(serial_fn: Callable[[], str] | None) -> list[str]:
+    """组装 adb shell 的 argv，serial_fn 提供目标设备时加 -s"""
+    argv = ["adb"]
+    if serial_fn is not None:
+        argv += ["-s", serial_fn()]
+    argv.append("shell")
+    return argv
+
+
+class SyncAdbSession:
+    """常驻 adb shell 会话（同步版，线程锁保证并发调用不交错读写）"""
+
+    def __init__(self, serial_fn: Callable[[], str] | None = None):
+        self._serial_fn = serial_fn
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _ensure_proc(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                _build_argv(self._serial_fn),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+        return self._proc
+
+    def run(self, cmd: str) -> str:
+        """在会话里执行一条 shell 命令，返回输出"""
+        with self._lock:
+            try:
+                proc = self._ensure_proc()
+                proc.stdin.write(f"{cmd}; echo {_SENTINEL}$?\n")
+                proc.stdin.flush()
+                lines = []
+                while True:
+                    line = proc.stdout.readline()
+                    if not line:
+                        raise OSError("adb shell 会话已断开")
+                    if line.startswith(_SENTINEL):
+                        break
+                    lines.append(line)
+                return "".join(lines)
+            except OSError as e:
+                logger.warning(f"adb shell 会话出错，将重建: {e}")
+                self.close()
+                return ""
+
+    def is_alive(self) -> bool:
+        """会话进程是否还活着（活着说明链路通，可跳过 devices 检查）"""
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+            self._proc = None
+
+
+class AsyncAdbSession:
+    """常驻 adb shell 会话（asyncio 版，管道读写挂起时事件循环照常跑）"""
+
+    def __init__(self, serial_fn: Callable[[], str] | None = None):
+        self._serial_fn = serial_fn
+        self._proc = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_proc(self):
+        if self._proc is None or self._proc.returncode is not None:
+            self._proc = await asyncio.create_subprocess_exec(
+                *_build_argv(self._serial_fn),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        return self._proc
+
+    async def run(self, cmd: str) -> str:
+        """在会话里执行一条 shell 命令，返回输出"""
+        async with self._lock:
+            try:
+                proc = await self._ensure_proc()
+                proc.stdin.write(f"{cmd}; echo {_SENTINEL}$?\n".encode())
+                await proc.stdin.drain()
+                lines = []
+                while True:
+                    line = await proc.stdout.readline()
+                    if not line:
+                        raise OSError("adb shell 会话已断开")
+                    if line.startswith(_SENTINEL.encode()):
+                        break
+                    lines.append(line)
+                return b"".join(lines).decode(errors="replace")
+            except OSError as e:
+                logger.warning(f"adb shell 会话出错，将重建: {e}")
+                self.close()
+                return ""
+
+    def is_alive(self) -> bool:
+        """会话进程是否还活着（活着说明链路通，可跳过 devices 检查）"""
+        return self._proc is not None and self._proc.returncode is None
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except (OSError, ProcessLookupError):
+                pass
+            self._proc = None
@@ -14,6 +14,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+from src.automation.adb_session import SyncAdbSession
+
 # 禁用代理
 for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
     os.environ.pop(key, None)
@@ -23,6 +25,27 @@ logger = logging.getLogger(__name__)
 # 美团外卖包名
 MEITUAN_PACKAGE = "com.sankuai.meituan.takeoutnew"
 
+# 从 Agent 返回文本中提取 JSON 块的正则（只编译一次）
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# reason 超过这个长度就不走正则，改用一遍线性括号扫描，
+# 避免贪婪 .* 在长文本上回溯
+_JSON_SCAN_THRESHOLD = 4096
+
+
+def _extract_json_block(reason: str) -> str | None:
+    """取出 reason 中最外层的 JSON 块文本（找不到返回 None）"""
+    if len(reason) <= _JSON_SCAN_THRESHOLD:
+        m = _JSON_BLOCK_RE.search(reason)
+        return m.group() if m else None
+    start = reason.find('{')
+    if start < 0:
+        return None
+    end = reason.rfind('}')
+    if end <= start:
+        return None
+    return reason[start:end + 1]
+
 # ADB 配置 - 从配置文件读取
 def _get_phone_config():
     """获取手机配置"""
@@ -53,9 +76,45 @@ LLM_CONFIG = {
 _task_lock = asyncio.Lock()
 _current_task: asyncio.Task | None = None
 
+# 跨任务复用的重对象：AdbTools（含 ADB 握手）、LLM 客户端和
+# DroidRun 配置每次调用都一样，没必要每个任务重建一遍
+_cached_tools = None
+_cached_llm = None
+_config_cache: dict[tuple, Any] = {}
+
+
+async def _get_tools():
+    """获取模块级 AdbTools 单例（首次调用时连接）"""
+    global _cached_tools
+    if _cached_tools is None:
+        from droidrun.tools import AdbTools
+        tools = AdbTools()
+        await tools.connect()
+        _cached_tools = tools
+    return _cached_tools
+
+
+def _get_llm():
+    """获取模块级 LLM 单例"""
+    global _cached_llm
+    if _cached_llm is None:
+        _cached_llm = _create_llm()
+    return _cached_llm
+
+
+# 常驻 adb shell 会话（实现见 adb_session.py，三个自动化模块共用）
+_adb_session = SyncAdbSession()
+
 
 def _run_adb(cmd: str, timeout: float = 10.0) -> str:
-    """执行 ADB 命令"""
+    """执行 ADB 命令
+
+    shell 子命令走常驻会话；connect/devices 等 server 级命令仍然
+    每次独立拉起 adb 客户端。
+    """
+    stripped = cmd.strip()
+    if stripped.startswith("shell "):
+        return _adb_session.run(stripped[len("shell "):])
     try:
         result = subprocess.run(
             f"adb {cmd}",
@@ -71,28 +130,33 @@ def _run_adb(cmd: str, timeout: float = 10.0) -> str:
 
 
 async def _ensure_adb_connection() -> bool:
-    """确保 ADB 连接"""
+    """确保 ADB 连接
+
+    快乐路径只查一次 adb devices：已在线直接返回。掉线时才走
+    adb connect，并直接解析它的返回串，省掉无条件 disconnect
+    和第二次 devices 校验（稳态 4 次 adb 调用 → 1 次）。
+    """
     phone_ip, adb_port = _get_adb_target()
     target = f"{phone_ip}:{adb_port}"
-    
+
     try:
         result = subprocess.run(["adb", "devices"], capture_output=True, text=True)
-        if target in result.stdout and "device" in result.stdout:
+        if f"{target}\tdevice" in result.stdout:
             return True
-            
+
         logger.info(f"[ADB] 尝试连接 {target}...")
-        subprocess.run(["adb", "disconnect", target], capture_output=True)
+        if f"{target}\toffline" in result.stdout:
+            # 只有 offline 时才需要先断开重连
+            subprocess.run(["adb", "disconnect", target], capture_output=True)
         connect_res = subprocess.run(["adb", "connect", target], capture_output=True, text=True)
-        
+
         if f"connected to {target}" in connect_res.stdout or "already connected" in connect_res.stdout:
-            verify_res = subprocess.run(["adb", "devices"], capture_output=True, text=True)
-            if target in verify_res.stdout and "device" in verify_res.stdout:
-                logger.info(f"[ADB] 连接成功: {target}")
-                return True
-        
+            logger.info(f"[ADB] 连接成功: {target}")
+            return True
+
         logger.warning(f"[ADB] 连接失败")
         return False
-        
+
     except Exception as e:
         logger.error(f"[ADB] 连接出错: {e}")
         return False
@@ -203,9 +267,9 @@ def _format_response_for_voice(raw_result: Any, task: str) -> dict:
         if reason:
             try:
                 # 尝试从 reason 中提取 JSON
-                json_match = re.search(r'\{[\s\S]*\}', reason)
-                if json_match:
-                    data = json.loads(json_match.group())
+                json_block = _extract_json_block(reason)
+                if json_block:
+                    data = json.loads(json_block)
                     response["data"] = data
                     
                     # 根据数据类型生成语音友好的消息
@@ -304,7 +368,6 @@ async def _execute_task_impl(
 ) -> dict:
     """执行任务的实际实现"""
     from droidrun.agent.droid import DroidAgent
-    from droidrun.tools import AdbTools
     
     # 确保 ADB 连接
     if not await _ensure_adb_connection():
@@ -352,13 +415,15 @@ async def _execute_task_impl(
 """
     
     try:
-        # 初始化工具
-        tools = AdbTools()
-        await tools.connect()
-        
-        # 创建配置和 LLM
-        config = _create_droidrun_config(max_steps=max_steps, reasoning=False)
-        llm = _create_llm()
+        # 工具/配置/LLM 跨任务复用，每个任务只新建 goal 和 Agent
+        tools = await _get_tools()
+
+        key = (max_steps, False)
+        config = _config_cache.get(key)
+        if config is None:
+            config = _create_droidrun_config(max_steps=max_steps, reasoning=False)
+            _config_cache[key] = config
+        llm = _get_llm()
         
         # 创建并运行 Agent
         agent = DroidAgent(
@@ -387,6 +452,9 @@ async def _execute_task_impl(
         }
     except Exception as e:
         logger.error(f"[ExecuteTask] 执行失败: {e}")
+        # 连接类故障时丢弃缓存的工具，下个任务重新握手
+        global _cached_tools
+        _cached_tools = None
         import traceback
         traceback.print_exc()
         return {
@@ -12,15 +12,37 @@ for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy
 
 import asyncio
 import logging
+import logging.handlers
+import queue
+import shlex
+import socket
 import subprocess
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any
 
+from src.automation.adb_session import SyncAdbSession
+
 logger = logging.getLogger(__name__)
 
+# 日志走后台队列：DroidRun 流式执行一步能打十几条 info，
+# 事件循环线程上只做入队（无 I/O），格式化和写 stderr 由
+# QueueListener 的专属线程完成
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
+
 # 美团外卖包名
 MEITUAN_PACKAGE = "com.sankuai.meituan.takeoutnew"
 
+# 搜索结果缓存：用户点单时常隔几十秒重复查同一个关键词，
+# 命中时省掉整轮重启 + 广告 + Agent 流程（30 秒级 → 微秒级）
+_SEARCH_CACHE_TTL = 60.0
+_SEARCH_CACHE_MAX = 32
+
 # ADB 连接配置 - 从配置文件读取
 def _get_phone_config():
     """获取手机配置"""
@@ -40,6 +62,165 @@ def _get_adb_target():
     return _phone_ip, _adb_port
 
 
+# 搜索任务不随关键词变化的部分：规则说明 + 返回格式。
+# 作为 system prompt 传给 LLM，每次搜索的 goal 只剩几行关键词相关
+# 步骤——prefill 按输入 token 线性计费/计时，这块能省掉大半
+_SEARCH_SYSTEM_PROMPT = """你是美团外卖自动化助手。执行搜索任务时遵守：
+
+- 搜索框内的滚动提示词是历史记录预览，不是当前输入，请忽略
+- 优先点击搜索页下方的推荐词（历史搜索/搜索发现），更快更准确
+- 点击搜索/推荐词之前页面显示的是推荐套餐，不是搜索结果；必须等页面刷新后再提取
+- 手动输入时：输入前先用 remember() 记住"搜索"按钮的中心坐标（从 bounds 计算）；输入后元素 index 会变化，用 swipe 同点滑动模拟点击该坐标：swipe(coordinate=[x, y], coordinate2=[x, y], duration=0.1)
+
+完成后以 JSON 格式返回搜索结果：
+{
+    "success": true,
+    "keyword": "<搜索关键词>",
+    "meals": [
+        {"name": "套餐名称", "price": "价格", "delivery_time": "配送时间"}
+    ]
+}
+"""
+
+
+# 进程级共享的 LLM HTTP 客户端：OpenAILike 默认每个实例自建连接池，
+# 即使实例有缓存，多个 Agent/多个 system prompt 变体也会各握一次手。
+# 这里统一成一对 (同步, 异步) 客户端，到 openrouter.ai 的 TLS 会话
+# 整个进程只建一次
+_llm_http_client = None
+_llm_async_http_client = None
+
+# openrouter.ai 的 DNS 解析结果缓存：glibc 的 getaddrinfo 是阻塞调用，
+# 新建连接时偶发 20-100ms 的解析尖刺；端点固定，解析一次按 TTL 复用
+_DNS_HOST = "openrouter.ai"
+_DNS_TTL = 300.0
+_dns_cache: dict[tuple, tuple[float, list]] = {}
+_orig_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(host, *args, **kwargs):
+    """只对固定的 LLM 端点做 TTL 缓存，其余域名原样透传"""
+    if host != _DNS_HOST:
+        return _orig_getaddrinfo(host, *args, **kwargs)
+    key = (host, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    hit = _dns_cache.get(key)
+    if hit is not None and now - hit[0] < _DNS_TTL:
+        return hit[1]
+    result = _orig_getaddrinfo(host, *args, **kwargs)
+    _dns_cache[key] = (time.monotonic(), result)
+    return result
+
+
+def _get_llm_http_clients():
+    """懒初始化共享的 httpx 客户端对（顺手装上 DNS 缓存）"""
+    global _llm_http_client, _llm_async_http_client
+    if _llm_async_http_client is None:
+        import httpx
+        if socket.getaddrinfo is not _cached_getaddrinfo:
+            socket.getaddrinfo = _cached_getaddrinfo
+        limits = httpx.Limits(max_keepalive_connections=8)
+        timeout = httpx.Timeout(60.0, connect=5.0)
+        _llm_http_client = httpx.Client(http2=True, limits=limits, timeout=timeout)
+        _llm_async_http_client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+    return _llm_http_client, _llm_async_http_client
+
+
+def _extract_meals_from_text(text: str, max_results: int) -> list[dict]:
+    """从（可能不完整的）模型输出里增量扫出 meals 数组的对象
+
+    小括号计数器代替整体 json.loads：每个套餐对象的右花括号一闭合
+    就能单独解析，凑够 max_results 或数组闭合即停。模型超量生成或
+    输出被截断时照样能拿到前几个完整对象。
+    """
+    import json
+    start = text.find('"meals"')
+    if start < 0:
+        return []
+    start = text.find('[', start)
+    if start < 0:
+        return []
+    meals = []
+    depth = 0
+    obj_start = -1
+    in_str = False
+    escape = False
+    for i in range(start + 1, len(text)):
+        ch = text[i]
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch == '{':
+            if depth == 0:
+                obj_start = i
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0 and obj_start >= 0:
+                try:
+                    meals.append(json.loads(text[obj_start:i + 1]))
+                except json.JSONDecodeError:
+                    pass
+                obj_start = -1
+                if len(meals) >= max_results:
+                    break
+        elif ch == ']' and depth == 0:
+            break
+    return meals
+
+
+# 重依赖延迟绑定：droidrun/llama_index 导入要几百毫秒，放在模块
+# 顶部会拖慢冷启动；但在函数里每次 from ... import 又要付
+# sys.modules 查找 + 属性绑定。折中：首次用到时导一次、绑到模块名
+DroidAgent = None
+AdbTools = None
+OpenAILike = None
+AgentConfig = None
+CodeActConfig = None
+ManagerConfig = None
+ExecutorConfig = None
+DroidrunConfig = None
+DeviceConfig = None
+LoggingConfig = None
+TelemetryConfig = None
+TracingConfig = None
+ToolsConfig = None
+
+
+def _ensure_deps():
+    """一次性导入并绑定所有重依赖（幂等）"""
+    global DroidAgent, AdbTools, OpenAILike
+    global AgentConfig, CodeActConfig, ManagerConfig, ExecutorConfig
+    global DroidrunConfig, DeviceConfig, LoggingConfig
+    global TelemetryConfig, TracingConfig, ToolsConfig
+    if DroidAgent is not None:
+        return
+    from droidrun.agent.droid import DroidAgent as _DroidAgent
+    from droidrun.tools import AdbTools as _AdbTools
+    from llama_index.llms.openai_like import OpenAILike as _OpenAILike
+    from droidrun.config_manager import config_manager as _cm
+    DroidAgent = _DroidAgent
+    AdbTools = _AdbTools
+    OpenAILike = _OpenAILike
+    AgentConfig = _cm.AgentConfig
+    CodeActConfig = _cm.CodeActConfig
+    ManagerConfig = _cm.ManagerConfig
+    ExecutorConfig = _cm.ExecutorConfig
+    DroidrunConfig = _cm.DroidrunConfig
+    DeviceConfig = _cm.DeviceConfig
+    LoggingConfig = _cm.LoggingConfig
+    TelemetryConfig = _cm.TelemetryConfig
+    TracingConfig = _cm.TracingConfig
+    ToolsConfig = _cm.ToolsConfig
+
+
 @dataclass
 class MealInfo:
     """套餐信息"""
@@ -49,12 +230,46 @@ class MealInfo:
     merchant: str | None = None
 
 
+@dataclass
+class PhaseTiming:
+    """一次搜索任务的分段耗时（毫秒）
+
+    端到端的总墙钟分不清是手机慢、广告长还是模型慢；
+    分段计时让每个优化都能单独验证、回归能定位到段。
+    """
+    restart_ms: float = 0.0   # ADB 检查 + 启停命令
+    ad_wait_ms: float = 0.0   # 广告等待（与工具预热并行段）
+    agent_ms: float = 0.0     # DroidRun Agent 全程（含所有 LLM 往返）
+    parse_ms: float = 0.0     # 结果 JSON 解析
+
+
+# 懒初始化的 uiautomator2 设备句柄：app 启停走已建立的长连接，
+# 不用每条命令 fork 一个 adb 进程（每次 ~50-200ms 的进程启动 + 握手）
+_u2_device = None
+
+
+def _get_u2_device():
+    """获取模块级 uiautomator2 设备句柄"""
+    global _u2_device
+    if _u2_device is None:
+        import uiautomator2 as u2
+        _u2_device = u2.connect()
+    return _u2_device
+
+
+# 常驻 adb shell 会话（实现见 adb_session.py，三个自动化模块共用）
+_adb_session = SyncAdbSession()
+
+
 def _run_adb(cmd: str, timeout: float = 10.0) -> str:
-    """执行 ADB 命令"""
+    """执行 ADB 命令（shell 子命令复用常驻会话）"""
+    if cmd.startswith("shell "):
+        return _adb_session.run(cmd[len("shell "):])
     try:
+        # argv 直接 exec，不经 /bin/sh -c：少 fork 一个 sh，
+        # 参数也不会再被宿主 shell 二次解释
         result = subprocess.run(
-            f"adb {cmd}",
-            shell=True,
+            ["adb", *shlex.split(cmd)],
             capture_output=True,
             text=True,
             timeout=timeout,
@@ -65,31 +280,134 @@ def _run_adb(cmd: str, timeout: float = 10.0) -> str:
         return ""
 
 
+async def _run_adb_async(cmd: str, timeout: float = 10.0) -> str:
+    """_run_adb 的协程版：不阻塞事件循环
+
+    shell 子命令仍复用常驻会话（管道读写是同步的，丢进线程池）；
+    其余命令用 asyncio 原生子进程，connect/devices 这类慢操作
+    挂起时事件循环照常跑别的协程。
+    """
+    if cmd.startswith("shell "):
+        return await asyncio.to_thread(_adb_session.run, cmd[len("shell "):])
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "adb", *shlex.split(cmd),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        return out.decode(errors="replace")
+    except Exception as e:
+        logger.error(f"ADB 命令失败: {e}")
+        return ""
+
+
+# 最近一次 devices 检查成功的时刻：背靠背的连接检查直接放行，
+# 不再每次都 fork 一个 adb 进程
+_ADB_CHECK_TTL = 2.0
+_adb_ok_ts = 0.0
+
+
+async def _adb_host_query(cmd: str, timeout: float = 2.0) -> str | None:
+    """直接跟本机 ADB 服务器（localhost:5037）说话
+
+    ADB 的主机协议就是 4 位十六进制长度 + 命令的文本协议；
+    `adb devices`/`adb connect` 各 fork 一个客户端进程只是为了
+    发这么一行。直连套接字把已连接热路径从 ~200ms 压到个位毫秒。
+    服务器没起或协议出错时返回 None（调用方退回子进程路径）。
+    """
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection("127.0.0.1", 5037), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        payload = cmd.encode("ascii")
+        writer.write(f"{len(payload):04x}".encode("ascii") + payload)
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readexactly(4), timeout)
+        length = int(await asyncio.wait_for(reader.readexactly(4), timeout), 16)
+        data = await asyncio.wait_for(reader.readexactly(length), timeout)
+        if status != b"OKAY":
+            logger.warning(f"[ADB] 服务器返回失败: {data.decode(errors='replace')}")
+            return None
+        return data.decode(errors="replace")
+    except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    finally:
+        writer.close()
+
+
 async def _ensure_adb_connection() -> bool:
-    """确保 ADB 连接，如果断开则尝试重连"""
+    """确保 ADB 连接，如果断开则尝试重连
+
+    优先直连 ADB 服务器套接字；服务器没起时拉一次 start-server
+    再退回子进程路径。
+    """
+    global _adb_ok_ts
     phone_ip, adb_port = _get_adb_target()
     target = f"{phone_ip}:{adb_port}"
-    
+
+    if time.monotonic() - _adb_ok_ts < _ADB_CHECK_TTL:
+        return True
+
+    devices = await _adb_host_query("host:devices")
+    if devices is not None:
+        if f"{target}\tdevice" in devices:
+            _adb_ok_ts = time.monotonic()
+            return True
+        logger.info(f"[ADB] 连接断开或未连接，尝试连接 {target}...")
+        if target in devices:
+            # 僵尸条目先踢掉
+            await _adb_host_query(f"host:disconnect:{target}")
+        connect_msg = await _adb_host_query(f"host:connect:{target}") or ""
+        if "connected to" in connect_msg or "already connected" in connect_msg:
+            verify = await _adb_host_query("host:devices") or ""
+            if f"{target}\tdevice" in verify:
+                logger.info(f"[ADB] 重连成功: {target}")
+                _adb_ok_ts = time.monotonic()
+                return True
+        logger.warning(f"[ADB] 重连失败: {connect_msg.strip()}")
+        return False
+
+    # 服务器可能没起：拉起来之后走一遍子进程路径
+    logger.info("[ADB] 服务器未响应，尝试 adb start-server...")
+    # 兜底路径的 subprocess.run 全部挪到线程池：重连尝试动辄几百毫秒，
+    # 不能让事件循环（MCP 心跳、日志）陪着干等
     try:
+        await asyncio.to_thread(
+            subprocess.run, ["adb", "start-server"], capture_output=True, timeout=10
+        )
         # 1. 检查当前是否已连接
-        result = subprocess.run(["adb", "devices"], capture_output=True, text=True)
+        result = await asyncio.to_thread(
+            subprocess.run, ["adb", "devices"], capture_output=True, text=True
+        )
         if target in result.stdout and "device" in result.stdout:
+            _adb_ok_ts = time.monotonic()
             return True
             
         logger.info(f"[ADB] 连接断开或未连接，尝试连接 {target}...")
         
         # 2. 尝试重连
         # 先断开可能的僵尸连接
-        subprocess.run(["adb", "disconnect", target], capture_output=True)
+        await asyncio.to_thread(
+            subprocess.run, ["adb", "disconnect", target], capture_output=True
+        )
         # 连接
-        connect_res = subprocess.run(["adb", "connect", target], capture_output=True, text=True)
+        connect_res = await asyncio.to_thread(
+            subprocess.run, ["adb", "connect", target], capture_output=True, text=True
+        )
         
         # 3. 验证连接结果
         if f"connected to {target}" in connect_res.stdout or "already connected" in connect_res.stdout:
             # 再次确认 devices 列表
-            verify_res = subprocess.run(["adb", "devices"], capture_output=True, text=True)
+            verify_res = await asyncio.to_thread(
+                subprocess.run, ["adb", "devices"], capture_output=True, text=True
+            )
             if target in verify_res.stdout and "device" in verify_res.stdout:
                 logger.info(f"[ADB] 重连成功: {target}")
+                _adb_ok_ts = time.monotonic()
                 return True
         
         logger.warning(f"[ADB] 重连失败: {connect_res.stdout.strip()}")
@@ -120,6 +438,13 @@ class MeituanAgent:
         self._model = model
         self._tools = None
         self._last_search_results: list[MealInfo] = []
+        # 按可调参数缓存配置和 LLM 客户端：一次会话里
+        # search→place_order→confirm_payment 三连发复用同一个
+        # HTTP 连接池，不再每次任务都重建并重新 TLS 握手
+        self._config_cache: dict[tuple, Any] = {}
+        self._llm_cache: dict[tuple, Any] = {}
+        # (keyword, max_results) -> (时间戳, 结果)，OrderedDict 当 LRU 用
+        self._search_cache: OrderedDict[tuple[str, int], tuple[float, dict]] = OrderedDict()
         
         # 获取 OpenRouter API Key
         self._api_key = api_key or os.environ.get("OPENROUTER_API_KEY", "")
@@ -129,30 +454,27 @@ class MeituanAgent:
     async def _ensure_tools(self):
         """确保 AdbTools 已初始化"""
         if self._tools is None:
-            from droidrun.tools import AdbTools
+            _ensure_deps()
             self._tools = AdbTools()
             await self._tools.connect()
             logger.info("DroidRun 工具已连接")
     
-    def _create_config(self, max_steps: int = 15, reasoning: bool = True):
-        """创建 DroidRun 配置
+    def _create_config(self, max_steps: int = 15, reasoning: bool = False):
+        """创建 DroidRun 配置（按 (max_steps, reasoning) 缓存）
+
+        默认关闭 Manager+Executor 双 Agent：所有调用方实际都传
+        reasoning=False，双份 system prompt 意味着每步双倍 prefill。
         
         Args:
             max_steps: 最大步数
             reasoning: 是否启用推理模式 (Manager+Executor)
         """
-        from droidrun.config_manager.config_manager import (
-            AgentConfig,
-            CodeActConfig,
-            ManagerConfig,
-            ExecutorConfig,
-            DroidrunConfig,
-            DeviceConfig,
-            LoggingConfig,
-            TelemetryConfig,
-            TracingConfig,
-            ToolsConfig,
-        )
+        cache_key = (max_steps, reasoning)
+        cached = self._config_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        _ensure_deps()
         
         # Agent 配置
         agent_config = AgentConfig(
@@ -188,7 +510,7 @@ class MeituanAgent:
         # 工具配置
         tools_config = ToolsConfig(disabled_tools=[])
         
-        return DroidrunConfig(
+        config = DroidrunConfig(
             agent=agent_config,
             device=device_config,
             logging=logging_config,
@@ -196,38 +518,53 @@ class MeituanAgent:
             tracing=tracing_config,
             tools=tools_config,
         )
+        self._config_cache[cache_key] = config
+        return config
     
-    def _create_llm(self):
-        """创建 OpenRouter LLM 实例"""
-        from llama_index.llms.openai_like import OpenAILike
-        return OpenAILike(
+    def _create_llm(self, system_prompt: str | None = None):
+        """创建 OpenRouter LLM 实例（按模型名 + system prompt 缓存）"""
+        cache_key = (self._model, system_prompt)
+        cached = self._llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        _ensure_deps()
+        http_client, async_http_client = _get_llm_http_clients()
+        llm = OpenAILike(
             model=self._model,
             api_key=self._api_key,
             api_base="https://openrouter.ai/api/v1",
             temperature=0.1,
             is_chat_model=True,
+            system_prompt=system_prompt,
+            http_client=http_client,
+            async_http_client=async_http_client,
         )
+        self._llm_cache[cache_key] = llm
+        return llm
     
-    async def _run_agent(self, goal: str, max_steps: int = 15, timeout: int = 300) -> dict:
+    async def _run_agent(self, goal: str, max_steps: int = 15, timeout: int = 300,
+                         system_prompt: str | None = None) -> dict:
         """运行 DroidRun Agent 执行任务
         
         Args:
             goal: 任务目标
             max_steps: 最大步数
             timeout: 超时时间（秒）
+            system_prompt: 任务不变的规则说明（经 LLM 的 system prompt 传入）
             
         Returns:
             执行结果
         """
-        from droidrun.agent.droid import DroidAgent
+        _ensure_deps()
         
         await self._ensure_tools()
         
         # 创建配置
-        config = self._create_config(max_steps=max_steps, reasoning=False)
+        config = self._create_config(max_steps=max_steps)
         
         # 创建 LLM
-        llm = self._create_llm()
+        llm = self._create_llm(system_prompt)
         
         # 创建 Agent - 使用新版 API
         agent = DroidAgent(
@@ -240,19 +577,49 @@ class MeituanAgent:
         
         logger.info(f"执行任务: {goal}")
         
+        stream_parts = []
+
+        async def _consume(handler):
+            # streaming=True 时边跑边把文本增量攒下来，
+            # 调用方不用等最终 reason 才开始解析
+            stream_events = getattr(handler, "stream_events", None)
+            if stream_events is not None:
+                try:
+                    async for event in stream_events():
+                        delta = getattr(event, "delta", None)
+                        if delta:
+                            stream_parts.append(delta)
+                except Exception as e:
+                    logger.debug(f"流式事件消费中断: {e}")
+            return await handler
+
         try:
-            # 新版 API 返回的是 handler
+            # 新版 API 返回的是 handler；DroidAgent 自带 timeout，但
+            # LLM 服务端挂起/流卡死时它可能失效——外层再兜一道
+            # wait_for，保证单个请求最坏也在期限内放掉
             handler = agent.run()
-            result = await handler
+            try:
+                result = await asyncio.wait_for(_consume(handler), timeout=timeout + 5)
+            except asyncio.TimeoutError:
+                cancel = getattr(handler, "cancel", None)
+                if callable(cancel):
+                    cancel()
+                logger.error(f"Agent 执行超时（>{timeout + 5}s），已取消")
+                return {
+                    "success": False,
+                    "error": f"任务超时（{timeout}秒）",
+                }
             
             return {
                 "success": True,
                 "result": result,
+                "stream_text": "".join(stream_parts),
             }
         except Exception as e:
-            logger.error(f"Agent 执行失败: {e}")
-            import traceback
-            traceback.print_exc()
+            # logger.exception 带完整堆栈，交给 handler 统一格式化输出；
+            # 原先的 traceback.print_exc 在事件循环线程上同步写 stderr，
+            # 错误风暴时会把其他协程一起拖住，还和日志重复打一遍
+            logger.exception("Agent 执行失败")
             return {
                 "success": False,
                 "error": str(e),
@@ -260,24 +627,71 @@ class MeituanAgent:
     
     async def _restart_meituan(self):
         """重启美团外卖 App，等待广告结束"""
-        import time
-        
+        if not await self._kick_restart_meituan():
+            return False
+        await self._wait_app_ready()
+        return True
+
+    async def _kick_restart_meituan(self) -> bool:
+        """只负责发出启停命令，不等广告——等待由 _wait_app_ready 单独做
+
+        拆开之后调用方可以在广告倒计时期间并行做别的事
+        （预热 AdbTools、建 LLM 连接）。
+        """
         # 先确保 ADB 已连接
         if not await _ensure_adb_connection():
             logger.error("ADB 连接失败，无法重启美团外卖")
             return False
-        
+
+        # 全程不碰事件循环线程：u2 的同步调用丢线程池，
+        # sleep 用 asyncio 版，adb 兜底走协程封装
         logger.info("关闭美团外卖...")
-        _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
-        time.sleep(1)
-        
-        logger.info("启动美团外卖...")
-        _run_adb(f"shell monkey -p {MEITUAN_PACKAGE} -c android.intent.category.LAUNCHER 1")
-        
-        logger.info("等待 5 秒（广告时间）...")
-        time.sleep(5)
-        logger.info("美团外卖已就绪")
+        try:
+            dev = await asyncio.to_thread(_get_u2_device)
+            await asyncio.to_thread(dev.app_stop, MEITUAN_PACKAGE)
+            await asyncio.sleep(1)
+            logger.info("启动美团外卖...")
+            await asyncio.to_thread(dev.app_start, MEITUAN_PACKAGE)
+        except Exception as e:
+            # u2 不可用时退回逐条 adb
+            logger.warning(f"u2 启停失败，退回 adb: {e}")
+            await _run_adb_async(f"shell am force-stop {MEITUAN_PACKAGE}")
+            await asyncio.sleep(1)
+            logger.info("启动美团外卖...")
+            await _run_adb_async(
+                f"shell monkey -p {MEITUAN_PACKAGE} -c android.intent.category.LAUNCHER 1"
+            )
+
         return True
+
+    async def _wait_app_ready(self):
+        """等首页广告结束（就绪轮询在线程池里跑）"""
+        ready = await asyncio.to_thread(self._wait_home_ready)
+        if ready:
+            logger.info("美团外卖已就绪")
+        else:
+            logger.warning("等待首页就绪超时，继续执行")
+
+    def _wait_home_ready(self, attempts: int = 20, interval: float = 0.25) -> bool:
+        """轮询首页是否就绪（出现"拼好饭"入口即认为广告已结束）
+
+        代替固定 sleep(5)：广告可跳过或本来就短的时候早退，
+        慢机器上也最多多等到 attempts*interval。
+        """
+        import time
+        try:
+            dev = _get_u2_device()
+        except Exception:
+            time.sleep(5)  # u2 不可用时只能退回定长等待
+            return True
+        for _ in range(attempts):
+            try:
+                if dev(text="拼好饭").exists:
+                    return True
+            except Exception:
+                pass
+            time.sleep(interval)
+        return False
     
     async def search_meals(self, keyword: str, max_results: int = 3) -> dict:
         """搜索套餐
@@ -289,13 +703,41 @@ class MeituanAgent:
         Returns:
             搜索结果
         """
-        # 重启美团确保干净状态
-        if not await self._restart_meituan():
+        cache_key = (keyword, max_results)
+        hit = self._search_cache.get(cache_key)
+        if hit is not None and time.monotonic() - hit[0] < _SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(cache_key)
+            logger.info(f"搜索缓存命中: {keyword}")
+            return hit[1]
+
+        result = await self._search_meals_uncached(keyword, max_results)
+        if result.get("success") and result.get("meals"):
+            self._search_cache[cache_key] = (time.monotonic(), result)
+            self._search_cache.move_to_end(cache_key)
+            while len(self._search_cache) > _SEARCH_CACHE_MAX:
+                self._search_cache.popitem(last=False)
+        return result
+
+    def invalidate_search_cache(self):
+        """清空搜索结果缓存（下单后菜单可能变化时由上层调用）"""
+        self._search_cache.clear()
+
+    async def _search_meals_uncached(self, keyword: str, max_results: int = 3) -> dict:
+        """真正执行一轮搜索（无缓存），结果带 timings 分段耗时"""
+        timing = PhaseTiming()
+        t0 = time.perf_counter()
+        # 重启美团确保干净状态；广告倒计时和 Agent 工具链预热
+        # （AdbTools.connect、首次导入）互不依赖，并行跑掉
+        if not await self._kick_restart_meituan():
             return {
                 "success": False,
                 "keyword": keyword,
                 "error": "无法连接到手机，请检查网络或手机状态",
             }
+        timing.restart_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        await asyncio.gather(self._wait_app_ready(), self._ensure_tools())
+        timing.ad_wait_ms = (time.perf_counter() - t0) * 1000
         
         # 使用 Agent 执行搜索
         goal = f"""你现在在美团外卖首页。请完成以下任务：
@@ -303,38 +745,20 @@ class MeituanAgent:
 1. 如果有弹窗（如红包、广告），先关闭它
 2. 找到并点击"拼好饭"入口
 3. 在拼好饭页面，点击搜索框进入搜索页
-4. 【优先】在搜索页查找"历史搜索"或"搜索发现"区域，寻找与"{keyword}"匹配或相关的关键词并点击
-5. 【备选】如果步骤4找不到匹配的关键词，则需要手动输入搜索（按以下步骤严格执行）：
-   a. 【先记住坐标】在输入前，找到"搜索"按钮并用 remember() 记住它的中心坐标（从 bounds 计算中心点）
-   b. 点击搜索输入框（EditText），输入"{keyword}"
-   c. 等待 1-2 秒让页面更新
-   d. 【用坐标点击】由于 click() 不支持坐标，使用 swipe 同点滑动模拟点击：swipe(coordinate=[x, y], coordinate2=[x, y], duration=0.1)
-6. 等待搜索结果加载完成（页面会刷新显示与"{keyword}"相关的套餐）
-7. 【重要】只从最终搜索结果页面提取前{max_results}个套餐信息
-
-⚠️ 注意事项：
-- 搜索框内的滚动提示词是历史记录预览，不是当前输入，请忽略
-- 优先点击搜索页下方的推荐词（历史搜索/搜索发现），这样更快更准确
-- 在点击搜索/推荐词之前的页面显示的是推荐套餐，不是搜索结果！
-- 必须在触发搜索后，等待页面刷新，才能从新页面提取结果
-- 搜索结果中的套餐名称通常会包含或关联关键词"{keyword}"
-- 【关键】输入文字后页面元素的 index 会变化！所以必须在输入前记住搜索按钮的坐标，然后用 swipe 同点滑动模拟点击！
-
-完成后，请以 JSON 格式返回搜索结果：
-{{
-    "success": true,
-    "keyword": "{keyword}",
-    "meals": [
-        {{
-            "name": "套餐名称",
-            "price": "价格",
-            "delivery_time": "配送时间"
-        }}
-    ]
-}}
+4. 【优先】在搜索页的"历史搜索"/"搜索发现"里点击与"{keyword}"匹配的关键词
+5. 【备选】找不到匹配词时手动输入"{keyword}"，按系统提示的坐标方式触发搜索
+6. 等待搜索结果刷新后，只从最终结果页提取前{max_results}个套餐信息，按约定 JSON 返回
 """
         
-        result = await self._run_agent(goal, max_steps=20, timeout=300)
+        # 提示词精简后搜索稳定在 10 步内收敛；上限压到 12，
+        # 模型跑偏时少烧 8 个完整的 prefill+decode 轮次
+        t0 = time.perf_counter()
+        result = await self._run_agent(
+            goal, max_steps=12, timeout=300,
+            system_prompt=_SEARCH_SYSTEM_PROMPT,
+        )
+        timing.agent_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
         
         if result["success"]:
             # 尝试解析 Agent 返回的 JSON 结果，提取 meals 数组
@@ -347,26 +771,122 @@ class MeituanAgent:
                     for meal in meals:
                         if "time" in meal and "delivery_time" not in meal:
                             meal["delivery_time"] = meal.pop("time")
+                    timing.parse_ms = (time.perf_counter() - t0) * 1000
                     return {
                         "success": True,
                         "keyword": keyword,
                         "meals": meals,
+                        "timings": timing,
+                    }
+            except Exception as e:
+                reason = str(getattr(result["result"], "reason", ""))
+                logger.warning(
+                    f"搜索结果 JSON 解析失败: {e}；输出末尾: {reason[-200:]}"
+                )
+                # 整体解析失败时从流式缓冲/原始输出里增量扫完整的套餐对象
+                meals = _extract_meals_from_text(
+                    result.get("stream_text") or reason, max_results
+                )
+                if meals:
+                    for meal in meals:
+                        if "time" in meal and "delivery_time" not in meal:
+                            meal["delivery_time"] = meal.pop("time")
+                    timing.parse_ms = (time.perf_counter() - t0) * 1000
+                    return {
+                        "success": True,
+                        "keyword": keyword,
+                        "meals": meals,
+                        "timings": timing,
                     }
-            except Exception:
-                pass
             # 解析失败时返回原始结果
+            timing.parse_ms = (time.perf_counter() - t0) * 1000
             return {
                 "success": True,
                 "keyword": keyword,
                 "meals": [],  # 无法解析时返回空数组
+                "timings": timing,
             }
         else:
             return {
                 "success": False,
                 "keyword": keyword,
                 "error": result["error"],
+                "timings": timing,
             }
     
+    async def search_meals_many(self, keywords: list[str], max_results: int = 3) -> list[dict]:
+        """批量搜索多个关键词
+
+        每个关键词单独调 search_meals 要付 N 次重启 + 广告等待 +
+        Agent 预热；这里整个批次只重启一次，由同一个 Agent 在搜索页
+        里逐个关键词搜完再一起返回。
+
+        Args:
+            keywords: 关键词列表
+            max_results: 每个关键词的最大结果数
+
+        Returns:
+            与 keywords 一一对应的结果列表（格式同 search_meals）
+        """
+        if not keywords:
+            return []
+        if len(keywords) == 1:
+            return [await self.search_meals(keywords[0], max_results)]
+
+        if not await self._kick_restart_meituan():
+            return [
+                {
+                    "success": False,
+                    "keyword": kw,
+                    "error": "无法连接到手机，请检查网络或手机状态",
+                }
+                for kw in keywords
+            ]
+        await asyncio.gather(self._wait_app_ready(), self._ensure_tools())
+
+        keyword_list = "、".join(f'"{kw}"' for kw in keywords)
+        goal = f"""你现在在美团外卖首页。请依次搜索以下关键词：{keyword_list}。
+
+1. 如果有弹窗（如红包、广告），先关闭它
+2. 找到并点击"拼好饭"入口，点击搜索框进入搜索页
+3. 对每个关键词：触发搜索（优先点推荐词，否则按系统提示手动输入），等结果刷新后提取前{max_results}个套餐，然后清空搜索框搜下一个
+4. 全部搜完后，以 JSON 格式一次性返回：
+{{"results": [{{"keyword": "<关键词>", "meals": [...]}}]}}
+results 必须按给定关键词的顺序排列。
+"""
+
+        result = await self._run_agent(
+            goal,
+            max_steps=10 + 10 * len(keywords),
+            timeout=180 + 120 * len(keywords),
+            system_prompt=_SEARCH_SYSTEM_PROMPT,
+        )
+
+        if not result["success"]:
+            return [
+                {"success": False, "keyword": kw, "error": result["error"]}
+                for kw in keywords
+            ]
+
+        by_keyword: dict[str, list] = {}
+        try:
+            import json
+            if hasattr(result["result"], "reason"):
+                data = json.loads(result["result"].reason)
+                for entry in data.get("results", []):
+                    meals = entry.get("meals", [])
+                    for meal in meals:
+                        if "time" in meal and "delivery_time" not in meal:
+                            meal["delivery_time"] = meal.pop("time")
+                    by_keyword[entry.get("keyword", "")] = meals
+        except Exception:
+            logger.warning("批量搜索结果解析失败，按空结果返回")
+
+        return [
+            {"success": True, "keyword": kw, "meals": by_keyword.get(kw, [])}
+            for kw in keywords
+        ]
+
     async def place_order(self, meal_name: str) -> dict:
         """下单指定套餐（到支付页面，不支付）
         
@@ -447,14 +967,32 @@ async def _test():
         api_key="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",
         model="anthropic/claude-haiku-4.5",
     )
+
+    # 预热：droidrun/llama_index 的首次导入和 AdbTools 连接是一次性
+    # 开销（通常 1-2 秒），放在计时外跑掉，搜索耗时只反映真实工作
+    async def _preheat():
+        await asyncio.to_thread(_ensure_deps)
+        await agent._ensure_tools()
+        agent._create_llm(_SEARCH_SYSTEM_PROMPT)
+
+    preheat_task = asyncio.create_task(_preheat())
     
     # 步骤1：搜索炒面
     print("=== 步骤1：搜索炒面 ===")
+    await preheat_task
     start_time = time.time()
     search_result = await agent.search_meals("炒面", max_results=3)
     search_time = time.time() - start_time
     print(f"搜索结果: {search_result}")
     print(f"⏱️ 搜索耗时: {search_time:.1f} 秒")
+    timings = search_result.get("timings")
+    if timings is not None:
+        print(
+            f"   分段: 重启 {timings.restart_ms:.0f}ms | "
+            f"广告等待 {timings.ad_wait_ms:.0f}ms | "
+            f"Agent {timings.agent_ms:.0f}ms | "
+            f"解析 {timings.parse_ms:.0f}ms"
+        )
     
     if not search_result.get("success"):
         print("搜索失败，无法继续下单测试")
@@ -489,4 +1027,11 @@ async def _test():
 
 
 if __name__ == "__main__":
+    # libuv 事件循环：回调/就绪通知开销比默认 selector 循环低，
+    # DroidRun 流式跑一个任务要过成百上千次事件循环跳转
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(_test())
@@ -8,17 +8,22 @@
 """
 
 import asyncio
+import concurrent.futures
 import json
 import os
 import re
-import subprocess
+import shlex
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 from droidrun.tools import AdbTools
 
+from src.automation.adb_session import AsyncAdbSession
+
 # 禁用代理（避免 SOCKS 代理问题）
 for key in ['http_proxy', 'https_proxy', 'HTTP_PROXY', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
     os.environ.pop(key, None)
@@ -51,9 +56,54 @@ LLM_CONFIG = {
     "model": "qwen-plus",
 }
 
+# 模块级共享的 LLM 客户端：每次搜索现建客户端会连带新建
+# httpx 连接池，对 dashscope 每次都重新 TLS 握手；
+# 共享实例让后续调用走 keep-alive 热连接。
+# 异步客户端让几秒的 LLM 往返挂起在 await 上而不是冻住事件循环，
+# _cancel_current_task 的取消信号才能真正打断在途请求
+_openai_client = AsyncOpenAI(
+    api_key=LLM_CONFIG["api_key"],
+    base_url=LLM_CONFIG["base_url"],
+    http_client=httpx.AsyncClient(
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=4),
+    ),
+)
+
+# bounds 格式 "x1,y1,x2,y2"，热循环里用预编译正则取坐标
+_BOUNDS_RE = re.compile(r'(\d+),(\d+),(\d+),(\d+)')
+
+# LLM 输出的 JSON 兜底提取（response_format 失灵时才用）
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# 元素扫描热循环里用到的界面文案/资源 id，集中在这里便于
+# 美团改版时一处更新
+_POPUP_TEXT = '收下'            # 红包弹窗按钮
+_UPDATE_CLOSE_ID = 'btn_close'  # 更新弹窗关闭按钮的 resource-id
+_INSTALL_TEXT = '立即安装'       # 更新弹窗的标记文本
+_PHF_TEXT = '拼好饭'
+_SEARCH_INPUT_TEXT = 'search-input'
+_SEARCH_TEXT = '搜索'
+_BUY_BTN_TEXT = '马上抢'
+_FAST_PAY_TEXT = '极速支付'
+_MIANMI_TEXT = '免密支付'
+
+# 聚类预过滤要跳过的系统噪声前缀（一次 startswith 判两种）
+_NOISE_PREFIXES = ('android.', 'mmp-')
+
+# 搜索输入页找不到"搜索"按钮 bounds 时的兜底坐标（1080p 竖屏实测值）
+_SEARCH_BTN_FALLBACK = (960, 173)
+
 # 调试输出目录
 DEBUG_DIR = Path(__file__).parent.parent.parent / "debug_output"
 
+# 调试落盘开关：MEITUAN_DEBUG=0 时完全跳过过滤和写盘
+_DEBUG_ENABLED = os.getenv("MEITUAN_DEBUG", "1") == "1"
+
+# 序列化 + 写盘丢给单线程 writer（保持文件按步骤顺序落盘），
+# 主流程不再为每步 10-50ms 的磁盘 I/O 停在事件循环上
+_debug_io = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 # 并发控制：全局锁和当前任务追踪
 # 防止多个工具调用同时操作手机 UI
 _meituan_lock = asyncio.Lock()
@@ -70,6 +120,9 @@ def _save_debug_step(session_id: str, step: str, elements: list, action: str = "
         action: 执行的动作描述
         extra: 额外信息
     """
+    if not _DEBUG_ENABLED:
+        return
+
     # 每次会话保存到独立的子文件夹
     session_dir = DEBUG_DIR / session_id
     session_dir.mkdir(parents=True, exist_ok=True)
@@ -96,18 +149,98 @@ def _save_debug_step(session_id: str, step: str, elements: list, action: str = "
     if extra:
         debug_data.update(extra)
     
-    # 保存到子文件夹
+    # 保存到子文件夹（后台线程序列化并写盘）
     filename = session_dir / f"{step}.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(debug_data, f, ensure_ascii=False, indent=2)
+    _debug_io.submit(_write_debug_file, filename, debug_data)
     
     print(f"[DEBUG] 已保存: {filename}")
 
 
-def _run_adb(cmd: str) -> str:
-    """执行 ADB 命令"""
-    result = subprocess.run(f"adb {cmd}", shell=True, capture_output=True, text=True)
-    return result.stdout + result.stderr
+def _write_debug_file(filename, debug_data):
+    """在 writer 线程里做 JSON 序列化和写盘"""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(debug_data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[DEBUG] 调试文件写入失败: {e}")
+
+
+# 常驻 adb shell 会话（实现见 adb_session.py，三个自动化模块共用）
+_adb_session = AsyncAdbSession(
+    serial_fn=lambda: "{}:{}".format(*_get_adb_target())
+)
+
+
+async def _run_adb(cmd: str) -> str:
+    """执行 ADB 命令（shell 子命令复用常驻会话）"""
+    if cmd.startswith("shell "):
+        return await _adb_session.run(cmd[len("shell "):])
+    # argv 直接 exec，不经 /bin/sh；协程等待期间事件循环照常跑
+    # 别的工具调用和取消信号
+    proc = await asyncio.create_subprocess_exec(
+        "adb", *shlex.split(cmd),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate()
+    return (out + err).decode(errors="replace")
+
+
+# 跨工具调用缓存的 AdbTools：connect() 在 Wi-Fi ADB 上要几百毫秒，
+# search→order→pay 连招没必要每步重连
+_tools = None
+
+
+async def _get_tools():
+    """获取缓存的 AdbTools 实例，必要时健康检查并重建"""
+    global _tools
+    if _tools is not None:
+        # shell 会话活着就视为链路健康；断了才花一次 get_state 探活
+        if _adb_session.is_alive():
+            return _tools
+        try:
+            await asyncio.wait_for(_tools.get_state(), timeout=5)
+            return _tools
+        except Exception as e:
+            print(f"[DEBUG] AdbTools 健康检查失败，重建连接: {e}")
+            _tools = None
+    tools = AdbTools()
+    await tools.connect()
+    _tools = tools
+    return _tools
+
+
+# get_state 是最重的一次 ADB 往返（整棵 UI 层级 dump，200-800ms）；
+# 相邻步骤在没有点击/输入发生时复用同一帧
+_STATE_TTL = 2.0
+
+
+async def _fresh_state(tools, max_age: float = _STATE_TTL):
+    """带短 TTL 的 tools.get_state()，tap/输入后由包装器失效"""
+    cached = getattr(tools, "_cached_state", None)
+    if cached is not None and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+    state = await tools.get_state()
+    tools._cached_state = (time.monotonic(), state)
+    return state
+
+
+async def _tap(tools, index):
+    """tap 并让缓存的页面状态失效"""
+    await tools.tap(index)
+    tools._cached_state = None
+
+
+async def _tap_xy(tools, x, y):
+    """按坐标 tap 并让缓存的页面状态失效"""
+    await tools.tap_by_coordinates(x, y)
+    tools._cached_state = None
+
+
+async def _input_text(tools, text, index, clear=False):
+    """输入文本并让缓存的页面状态失效"""
+    await tools.input_text(text, index, clear=clear)
+    tools._cached_state = None
 
 
 async def _cancel_current_task():
@@ -120,37 +253,38 @@ async def _cancel_current_task():
         except asyncio.CancelledError:
             pass
         # 确保 App 被关闭，留给下一个任务干净的状态
-        _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
+        await _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
 
 
 async def _ensure_adb_connection() -> bool:
     """确保 ADB 连接，如果断开则尝试重连"""
     phone_ip, adb_port = _get_adb_target()
     target = f"{phone_ip}:{adb_port}"
+
+    # 常驻 shell 会话还活着就说明链路没断，连 devices 都不用跑
+    if _adb_session.is_alive():
+        return True
     
     try:
         # 1. 检查当前是否已连接
-        result = subprocess.run(["adb", "devices"], capture_output=True, text=True)
-        if target in result.stdout and "device" in result.stdout:
+        devices_out = await _run_adb("devices")
+        if target in devices_out and "device" in devices_out:
             return True
             
         print(f"[ADB] 连接断开或未连接，尝试连接 {target}...")
         
-        # 2. 尝试重连
-        # 先断开可能的僵尸连接
-        subprocess.run(["adb", "disconnect", target], capture_output=True)
-        # 连接
-        connect_res = subprocess.run(["adb", "connect", target], capture_output=True, text=True)
+        # 2. 尝试重连：先断开可能的僵尸连接再连
+        # （probe 已确认未连接，这里的 disconnect 不会误杀活连接）
+        await _run_adb(f"disconnect {target}")
+        connect_out = await _run_adb(f"connect {target}")
         
-        # 3. 验证连接结果
-        if f"connected to {target}" in connect_res.stdout or "already connected" in connect_res.stdout:
-            # 再次确认 devices 列表
-            verify_res = subprocess.run(["adb", "devices"], capture_output=True, text=True)
-            if target in verify_res.stdout and "device" in verify_res.stdout:
-                print(f"[ADB] 重连成功: {target}")
-                return True
+        # 3. adb connect 的输出本身就是权威结果，
+        # 不再多跑一次 devices 复核（省一次客户端往返）
+        if f"connected to {target}" in connect_out or "already connected" in connect_out:
+            print(f"[ADB] 重连成功: {target}")
+            return True
         
-        print(f"[ADB] 重连失败: {connect_res.stdout.strip()}")
+        print(f"[ADB] 重连失败: {connect_out.strip()}")
         return False
         
     except Exception as e:
@@ -210,15 +344,14 @@ async def _search_meals_impl(keyword: str) -> dict:
             "error": f"无法连接到手机，请检查网络或手机状态"
         }
 
-    tools = AdbTools()
-    await tools.connect()
+    tools = await _get_tools()
     
     # 生成调试会话ID
     session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
     print(f"[DEBUG] 搜索会话开始: {session_id}, 关键词: {keyword}")
     
     # 步骤 1: 关闭美团
-    _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
+    await _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
     
     # 步骤 2: 打开美团
     await tools.start_app(MEITUAN_PACKAGE)
@@ -227,102 +360,90 @@ async def _search_meals_impl(keyword: str) -> dict:
     await asyncio.sleep(5)
     
     # 步骤 3.5: 检测并关闭弹窗 (红包或更新弹窗)
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     _save_debug_step(session_id, "01_after_open", elements, "打开美团后", {"keyword": keyword})
     
+    # 一遍扫描同时认红包按钮、更新弹窗关闭按钮和"立即安装"标记，
+    # 不再对几百个元素做两轮独立遍历
     popup_closed = False
+    popup_hit = None        # (index, 描述)
+    has_update_popup = False
     for el in elements:
-        text = el.get('text', '')
-        resource_id = el.get('resourceId', '')
-        
-        # 情况1: 红包弹窗
-        if '收下' in text:
-            # 找到红包弹窗，点击"开心收下"或类似按钮
-            await tools.tap(el.get('index'))
-            popup_closed = True
-            print(f"[DEBUG] 检测到红包弹窗，已点击关闭")
-            await asyncio.sleep(1)
+        get = el.get
+        text = get('text', '')
+        resource_id = get('resourceId', '')
+
+        # 情况1: 红包弹窗；情况2: 版本更新弹窗的关闭按钮
+        # (com.sankuai.meituan.takeoutnew:id/btn_close)
+        if text and _POPUP_TEXT in text:
+            popup_hit = (get('index'), "红包弹窗")
             break
-            
-        # 情况2: 版本更新弹窗 (根据用户提供的 page_elements.json)
-        # 查找关闭按钮: com.sankuai.meituan.takeoutnew:id/btn_close
-        if 'btn_close' in resource_id:
-            await tools.tap(el.get('index'))
-            popup_closed = True
-            print(f"[DEBUG] 检测到更新弹窗，已点击关闭按钮 (id={resource_id})")
-            await asyncio.sleep(1)
+        if resource_id and _UPDATE_CLOSE_ID in resource_id:
+            popup_hit = (get('index'), f"更新弹窗 (id={resource_id})")
             break
-            
-        # 情况2备选: 如果找不到ID，通过"立即安装"判断是否存在弹窗，然后找关闭按钮
-    
-    # 如果没通过 ID 找到关闭按钮，但看到了"立即安装"，尝试找一下关闭按钮（防止 id 变动）
-    if not popup_closed:
-        has_update_popup = False
-        for el in elements:
-            if '立即安装' in el.get('text', ''):
-                has_update_popup = True
-                break
-        
-        if has_update_popup:
-            # 尝试通过位置或层级找关闭按钮 (通常在右上角)
-            # 这里简单起见，如果刚才没找到 btn_close，可能需要更复杂的逻辑，
-            # 但根据 page_elements.json，btn_close 是存在的。
-            # 为了稳健，我们可以遍历找一下 className 为 Button 且 bounds 在右上角的
-            pass
+        if text and _INSTALL_TEXT in text:
+            has_update_popup = True
+    
+    if popup_hit:
+        await _tap(tools, popup_hit[0])
+        popup_closed = True
+        print(f"[DEBUG] 检测到{popup_hit[1]}，已点击关闭")
+        await asyncio.sleep(1)
+    elif has_update_popup:
+        # 看到"立即安装"但没找到 btn_close（id 变动）：
+        # 按 page_elements.json 的经验 btn_close 应该在，这里先不处理
+        pass
 
     if popup_closed:
-        desc, _, elements, phone_state = await tools.get_state()
+        desc, _, elements, phone_state = await _fresh_state(tools)
         _save_debug_step(session_id, "02_after_popup", elements, "关闭弹窗后")
     
-    # 步骤 4: 点击拼好饭
-    desc, _, elements, phone_state = await tools.get_state()
+    # 步骤 4: 点击拼好饭（没关过弹窗时直接复用步骤 3.5 的那帧）
+    desc, _, elements, phone_state = await _fresh_state(tools)
     _save_debug_step(session_id, "03_before_phf", elements, "准备点击拼好饭")
     
     phf_index = None
     for el in elements:
         text = el.get('text', '')
-        if '拼好饭' in text:
+        if text and _PHF_TEXT in text:
             phf_index = el.get('index')
             break
     
     if phf_index:
-        await tools.tap(phf_index)
+        await _tap(tools, phf_index)
         _save_debug_step(session_id, "03_click_phf", [], f"点击拼好饭 index={phf_index}")
     
     # 步骤 5: 点击搜索框
     await asyncio.sleep(2)
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     _save_debug_step(session_id, "04_phf_page", elements, "拼好饭页面")
     
     search_index = None
     for el in elements:
-        text = el.get('text', '')
-        if text == 'search-input':
+        if el.get('text', '') == _SEARCH_INPUT_TEXT:
             search_index = el.get('index')
             break
-    
+
     if not search_index:
         for el in elements:
-            text = el.get('text', '')
-            if text == '搜索':
+            if el.get('text', '') == _SEARCH_TEXT:
                 search_index = el.get('index')
                 break
     
     if search_index:
-        await tools.tap(search_index)
+        await _tap(tools, search_index)
         _save_debug_step(session_id, "04_click_search", [], f"点击搜索框 index={search_index}")
     
     # 步骤 6: 输入搜索关键词
     await asyncio.sleep(2)
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     _save_debug_step(session_id, "05_search_input_page", elements, "搜索输入页面")
     
     # 从页面元素中提取搜索按钮的坐标
     search_btn_x = None
     search_btn_y = None
     for el in elements:
-        text = el.get('text', '')
-        if text == '搜索':
+        if el.get('text', '') == _SEARCH_TEXT:
             bounds = el.get('bounds', '')
             if bounds:
                 # bounds 格式: "x1,y1,x2,y2"
@@ -338,8 +459,7 @@ async def _search_meals_impl(keyword: str) -> dict:
     
     # 如果未找到，使用默认坐标（fallback）
     if search_btn_x is None or search_btn_y is None:
-        search_btn_x = 960
-        search_btn_y = 173
+        search_btn_x, search_btn_y = _SEARCH_BTN_FALLBACK
     
     input_index = None
     for el in elements:
@@ -349,39 +469,64 @@ async def _search_meals_impl(keyword: str) -> dict:
             break
     
     if input_index:
-        await tools.input_text(keyword, input_index, clear=True)
+        await _input_text(tools, keyword, input_index, clear=True)
         _save_debug_step(session_id, "05_input_keyword", [], f"输入关键词 '{keyword}' index={input_index}", 
                         {"search_btn_coords": f"({search_btn_x}, {search_btn_y})"})
     
     # 步骤 7: 点击搜索按钮
     # 使用从步骤 6 提取的搜索按钮坐标点击（避免页面元素获取问题）
     await asyncio.sleep(1)
-    await tools.tap_by_coordinates(search_btn_x, search_btn_y)
+    await _tap_xy(tools, search_btn_x, search_btn_y)
     _save_debug_step(session_id, "06_click_search_btn", [], f"点击搜索按钮 坐标=({search_btn_x}, {search_btn_y})")
     await asyncio.sleep(2)
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     
     # 保存搜索结果页面
     _save_debug_step(session_id, "07_search_result", elements, "搜索结果页面")
     
-    # 步骤 8: 直接将完整元素信息传给 LLM 分析
+    # 步骤 8: 预过滤 + 聚类后再交给 LLM 分析
     
-    # 构建完整的元素列表（包含所有信息）
-    elements_for_llm = []
+    # 先在 Python 侧筛掉系统噪声、按 y1 坐标聚成 300px 行带，
+    # 只发含关键词的前几个行带（候选卡片）：prompt 按 token 计费，
+    # 延迟也随长度线性涨，全量 200+ 元素大多是无关的
+    buckets: dict[int, list[dict]] = {}
     for el in elements:
-        text = el.get('text', '')
-        bounds = el.get('bounds', '')
-        idx = el.get('index', 0)
-        # 保留所有有文本的元素
-        if text and len(text.strip()) > 0:
-            elements_for_llm.append({
-                'index': idx,
-                'text': text,
-                'bounds': bounds
-            })
+        get = el.get
+        text = get('text', '')
+        if not text or not text.strip():
+            continue
+        if text.startswith(_NOISE_PREFIXES):
+            continue
+        bounds = get('bounds', '')
+        m = _BOUNDS_RE.search(bounds) if bounds else None
+        y1 = int(m.group(2)) if m else 0
+        buckets.setdefault(y1 // 300, []).append({
+            'index': get('index', 0),
+            'text': text,
+            'bounds': bounds
+        })
+    
+    # 0 号行带是顶栏：搜索框会回显关键词，bounds 缺失/解析失败的元素
+    # 也都落在这里，所以它几乎必然命中——跳过它，否则卡片名不含
+    # 字面关键词的页面会只剩顶栏那两个行带，真正的结果全被挤掉
+    keyword_bands = [
+        b for b in sorted(buckets)
+        if b > 0 and any(keyword in e['text'] for e in buckets[b])
+    ][:3]
+    if keyword_bands:
+        # 卡片可能跨带：命中带的下一个行带一并带上（价格/配送时间常在下半）
+        selected = set()
+        for b in keyword_bands:
+            selected.update((b, b + 1))
+        elements_for_llm = [
+            e for b in sorted(selected) if b in buckets for e in buckets[b]
+        ]
+    else:
+        # 结果名可能是近义词没带关键词：退回全量过滤后的列表
+        elements_for_llm = [e for b in sorted(buckets) for e in buckets[b]]
     
-    # 转为 JSON 字符串
-    elements_json = json.dumps(elements_for_llm, ensure_ascii=False, indent=2)
+    # 紧凑 JSON：没有缩进空白，token 减半
+    elements_json = json.dumps(elements_for_llm, ensure_ascii=False, separators=(',', ':'))
     
     prompt = f"""你是一个美团外卖搜索结果分析助手。下面是搜索"{keyword}"后的页面元素列表，每个元素包含 index（序号）、text（文本）、bounds（位置坐标 x1,y1,x2,y2）。
 
@@ -415,23 +560,23 @@ async def _search_meals_impl(keyword: str) -> dict:
 """
     
     try:
-        
-        client = OpenAI(
-            api_key=LLM_CONFIG["api_key"],
-            base_url=LLM_CONFIG["base_url"],
-        )
-        
-        response = client.chat.completions.create(
+        # response_format 让模型直接输出裸 JSON，
+        # 不再靠回溯正则从散文/markdown 围栏里抠对象
+        response = await _openai_client.chat.completions.create(
             model=LLM_CONFIG["model"],
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
+            response_format={"type": "json_object"},
         )
         
         result_text = response.choices[0].message.content
-        json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+        try:
+            result_json = json.loads(result_text)
+        except json.JSONDecodeError:
+            json_match = _JSON_RE.search(result_text)
+            result_json = json.loads(json_match.group()) if json_match else None
         
-        if json_match:
-            result_json = json.loads(json_match.group())
+        if result_json is not None:
             return {
                 "success": True,
                 "keyword": keyword,
@@ -498,11 +643,10 @@ async def _place_order_impl(meal_name: str) -> dict:
             "error": "无法连接到手机，请检查网络或手机状态"
         }
 
-    tools = AdbTools()
-    await tools.connect()
+    tools = await _get_tools()
     
     # 步骤 1: 查找并点击指定套餐
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     meal_index = None
     for el in elements:
         text = el.get('text', '')
@@ -511,72 +655,75 @@ async def _place_order_impl(meal_name: str) -> dict:
             break
     
     if meal_index:
-        await tools.tap(meal_index)
+        await _tap(tools, meal_index)
     
     # 步骤 2: 等待详情页加载完成
     await asyncio.sleep(2)
     
     # 步骤 3: 查找并点击"马上抢"按钮
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     buy_btn_index = None
     for el in elements:
         text = el.get('text', '')
-        if '马上抢' in text:
+        if text and _BUY_BTN_TEXT in text:
             buy_btn_index = el.get('index')
             break
     
     if buy_btn_index:
-        await tools.tap(buy_btn_index)
+        await _tap(tools, buy_btn_index)
     
     # 步骤 4: 等待加载完成
     await asyncio.sleep(2)
     
     # 步骤 5: 再次查找并点击"马上抢"按钮
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     buy_btn_index2 = None
     for el in elements:
         text = el.get('text', '')
-        if '马上抢' in text:
+        if text and _BUY_BTN_TEXT in text:
             buy_btn_index2 = el.get('index')
             break
     
     if buy_btn_index2:
-        await tools.tap(buy_btn_index2)
+        await _tap(tools, buy_btn_index2)
     
     # 步骤 6: 等待进入支付页面
     await asyncio.sleep(2)
     
     # 步骤 7: 验证到达支付页面并提取最终价格
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     
+    # 一遍扫描同时记下"极速支付"位置、所有 ¥ 位置和可能的价格片段，
+    # 取代原来对同一列表的三轮独立遍历（每轮都重查一遍 dict）
     payment_btn_index = None
+    yuan_indices = []
+    price_candidates = []
     for el in elements:
-        text = el.get('text', '')
-        if text == '极速支付':
-            payment_btn_index = el.get('index')
-            break
+        get = el.get
+        text = get('text', '')
+        if not text or not text.strip():
+            continue
+        idx = get('index')
+        if payment_btn_index is None and text == _FAST_PAY_TEXT:
+            payment_btn_index = idx
+        if text == '¥':
+            yuan_indices.append(idx)
+            price_candidates.append((idx, text))
+        elif text == '.' or text.isdigit():
+            price_candidates.append((idx, text))
     
     if payment_btn_index:
-        # 先找到"¥"的位置
-        yuan_index = None
-        for el in elements:
-            text = el.get('text', '')
-            idx = el.get('index')
-            if text == '¥' and idx < payment_btn_index:
-                yuan_index = idx
-        
+        # 取支付按钮前最后一个 ¥ 作为价格起点
+        yuan_index = max(
+            (i for i in yuan_indices if i < payment_btn_index), default=None
+        )
         if yuan_index:
-            # 收集¥和极速支付之间的价格字符
-            price_parts = []
-            for el in elements:
-                idx = el.get('index')
-                text = el.get('text', '')
-                if yuan_index <= idx < payment_btn_index and text.strip():
-                    if text in ['¥', '.'] or text.isdigit():
-                        price_parts.append((idx, text))
-            
-            price_parts.sort(key=lambda x: x[0])
-            final_price = ''.join([text for idx, text in price_parts])
+            # ¥ 和极速支付之间的片段按 index 排好序拼成完整价格
+            price_parts = sorted(
+                (idx, text) for idx, text in price_candidates
+                if yuan_index <= idx < payment_btn_index
+            )
+            final_price = ''.join(text for idx, text in price_parts)
             
             return {
                 "success": True,
@@ -631,11 +778,10 @@ async def _confirm_payment_impl() -> dict:
             "error": "无法连接到手机，请检查网络或手机状态"
         }
 
-    tools = AdbTools()
-    await tools.connect()
+    tools = await _get_tools()
     
     # 步骤 1: 查看当前页面状态
-    desc, _, elements, phone_state = await tools.get_state()
+    desc, _, elements, phone_state = await _fresh_state(tools)
     
     # 步骤 2: 查找并点击支付按钮
     # 模糊匹配包含"支付"的元素，选择最后一个（通常是真正的按钮）
@@ -643,33 +789,32 @@ async def _confirm_payment_impl() -> dict:
     payment_btn_text = None
     for el in elements:
         text = el.get('text', '')
-        if '支付' in text:
+        if text and '支付' in text:
             payment_btn_index = el.get('index')
             payment_btn_text = text
             # 不 break，继续遍历找到最后一个
     
     if payment_btn_index:
-        await tools.tap(payment_btn_index)
+        await _tap(tools, payment_btn_index)
         
         # 步骤 3: 等待2秒
         await asyncio.sleep(2)
         
         # 步骤 4: 查找"免密支付"按钮
-        desc, _, elements, phone_state = await tools.get_state()
+        desc, _, elements, phone_state = await _fresh_state(tools)
         
         mianmi_btn_index = None
         for el in elements:
-            text = el.get('text', '')
-            if text == '免密支付':
+            if el.get('text', '') == _MIANMI_TEXT:
                 mianmi_btn_index = el.get('index')
                 break
         
         if mianmi_btn_index:
-            await tools.tap(mianmi_btn_index)
+            await _tap(tools, mianmi_btn_index)
             # 等待支付完成
             await asyncio.sleep(2)
             # 关闭美团，确保通知栏能显示送达通知
-            _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
+            await _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
             return {
                 "success": True,
                 "message": f"已点击支付按钮: {payment_btn_text}，并点击免密支付"
@@ -678,7 +823,7 @@ async def _confirm_payment_impl() -> dict:
             # 等待支付完成
             await asyncio.sleep(2)
             # 关闭美团，确保通知栏能显示送达通知
-            _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
+            await _run_adb(f"shell am force-stop {MEITUAN_PACKAGE}")
             return {
                 "success": True,
                 "message": f"已点击支付按钮: {payment_btn_text}"